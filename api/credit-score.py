@@ -1,28 +1,17 @@
-from http.server import BaseHTTPRequestHandler
-import json
+import os
+import sys
 
-class handler(BaseHTTPRequestHandler):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+from serverless import APIHandler, cached_json
+
+
+def _credit_score(conn):
+    # Imported on first use so cold starts only pay for what they call
+    import pos_data
+    return pos_data.get_credit_score(conn)
+
+
+class handler(APIHandler):
     def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        # Demo credit score data
-        credit_data = {
-            "score": 45,
-            "total_sales": 230.0,
-            "transaction_count": 12,
-            "avg_transaction": 19.17,
-            "digital_adoption": 25.0,
-            "active_days": 8
-        }
-        
-        self.wfile.write(json.dumps(credit_data).encode())
-    
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        self.send_json(cached_json('credit-score', _credit_score))
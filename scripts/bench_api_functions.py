@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Serverless Function Benchmark
+Measures cold and warm latency of each Vercel function in api/
+
+Each function runs in a fresh Python process: cold latency covers module
+import plus the first request, warm latency is the mean of the requests after it.
+Run from the repository root: python scripts/bench_api_functions.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+FUNCTIONS = ['inventory', 'sales-history', 'credit-score']
+WARM_REQUESTS = 200
+
+CHILD = r'''
+import http.client, importlib.util, json, sys, threading, time
+from http.server import HTTPServer
+
+path, warm_requests = sys.argv[1], int(sys.argv[2])
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('fn', path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+import_ms = (time.perf_counter() - start) * 1000
+
+server = HTTPServer(('127.0.0.1', 0), module.handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+def request():
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_port)
+    conn.request('GET', '/')
+    conn.getresponse().read()
+    conn.close()
+
+t = time.perf_counter()
+request()
+cold_ms = import_ms + (time.perf_counter() - t) * 1000
+
+t = time.perf_counter()
+for _ in range(warm_requests):
+    request()
+warm_ms = (time.perf_counter() - t) * 1000 / warm_requests
+
+server.shutdown()
+print(json.dumps({"import_ms": import_ms, "cold_ms": cold_ms, "warm_ms": warm_ms}))
+'''
+
+
+def bench(name):
+    path = os.path.join('api', f'{name}.py')
+    out = subprocess.run([sys.executable, '-c', CHILD, path, str(WARM_REQUESTS)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    print(f"{'function':<16}{'import ms':>12}{'cold ms':>12}{'warm ms':>12}")
+    for name in FUNCTIONS:
+        r = bench(name)
+        print(f"{name:<16}{r['import_ms']:>12.2f}{r['cold_ms']:>12.2f}{r['warm_ms']:>12.3f}")
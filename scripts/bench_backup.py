@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Backup Write-Latency Benchmark
+Sale commit latency with no backup, during a full snapshot and during an incremental one
+
+Run from the repository root: python scripts/bench_backup.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+import backup
+import stock
+
+HISTORY_ROWS = 300000
+BASELINE_SECONDS = 2.0
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute('''CREATE TABLE sales (id INTEGER PRIMARY KEY, item_name TEXT, quantity INTEGER,
+                    total REAL, payment_method TEXT, amount_received REAL,
+                    change_given REAL, timestamp TEXT)''')
+    start = datetime.now() - timedelta(days=365)
+    rows = ((random.choice(['Bread', 'Milk', 'Airtime R10']), 1, 15.0, random.choice(['cash', 'card']),
+             20.0, 5.0, (start + timedelta(seconds=i * 60)).isoformat())
+            for i in range(HISTORY_ROWS))
+    conn.executemany('''INSERT INTO sales (item_name, quantity, total, payment_method,
+                        amount_received, change_given, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.commit()
+    conn.close()
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)] if values else 0.0
+
+
+def measure_writes(path, during):
+    """Commit sales continuously while `during()` runs; returns latencies and its duration"""
+    latencies = []
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        while not stop.is_set():
+            start = time.perf_counter()
+            with stock.write_transaction(conn) as c:
+                c.execute("INSERT INTO sales (item_name, quantity, total, payment_method, timestamp) VALUES (?, 1, 15.0, 'cash', ?)",
+                          ('Bread', datetime.now().isoformat()))
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.002)
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    start = time.perf_counter()
+    during()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+    return latencies, elapsed
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'pos_system.db')
+        backup_dir = os.path.join(tmp, 'backups')
+        seed(db_path)
+        size_mb = os.path.getsize(db_path) / 1e6
+
+        runs = [
+            ('no backup', lambda: time.sleep(BASELINE_SECONDS)),
+            ('full snapshot', lambda: backup.snapshot(db_path, backup_dir, full=True)),
+            ('incremental', lambda: backup.snapshot(db_path, backup_dir)),
+        ]
+        print(f"{HISTORY_ROWS} sales, {size_mb:.1f} MB database")
+        print(f"{'run':<16}{'backup s':>10}{'commits':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for name, during in runs:
+            latencies, elapsed = measure_writes(db_path, during)
+            print(f"{name:<16}{elapsed:>10.2f}{len(latencies):>9}{percentile(latencies, 50):>9.2f}"
+                  f"{percentile(latencies, 99):>9.2f}{max(latencies):>9.2f}")
+
+        manifest = backup.load_manifest(backup_dir)
+        for entry in manifest['chain']:
+            print(f"  {entry['file']}: {entry['pages']} of {entry['page_count']} pages shipped")
+
+        restored = os.path.join(tmp, 'restored.db')
+        backup.restore(backup_dir, restored)
+        print("Restore verified (checksum and integrity_check)")
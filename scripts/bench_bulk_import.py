@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Bulk Import Benchmark
+Loads a 100k-row wholesaler price list through /api/inventory/bulk
+
+Compares one streamed bulk upload (CSV and NDJSON) with the old
+one-POST-per-item path, re-imports the list as an update, and times the
+streamed export. Run from the repository root: python scripts/bench_bulk_import.py
+"""
+
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+ROWS = 100000
+PER_ITEM_SAMPLE = 1000
+
+
+def in_blocks(lines, size=65536):
+    """Group lines into upload chunks the way a buffered client sends them"""
+    block = []
+    length = 0
+    for line in lines:
+        block.append(line)
+        length += len(line)
+        if length >= size:
+            yield b''.join(block)
+            block, length = [], 0
+    if block:
+        yield b''.join(block)
+
+
+def price_list_csv(rows, offset=0):
+    yield b'name,price,quantity\n'
+    for i in range(rows):
+        yield f'Item {i:06d},{10 + (i + offset) % 90}.50,{i % 200}\n'.encode()
+    yield b'Broken row,not-a-price,5\n'
+
+
+def price_list_ndjson(rows):
+    for i in range(rows):
+        yield (json.dumps({"name": f"Item {i:06d}", "price": 10 + i % 90, "quantity": i % 200}) + '\n').encode()
+
+
+def upload(port, path, lines, content_type):
+    """POST a generated body with chunked encoding, as a streaming client would"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    conn.request('POST', path, body=in_blocks(lines), headers={'Content-Type': content_type},
+                 encode_chunked=True)
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    conn.close()
+    return result
+
+
+def per_item(port, count):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for i in range(count):
+        conn.request('POST', '/api/inventory',
+                     json.dumps({"name": f"Single {i}", "price": 10.0, "quantity": 5}),
+                     {'Content-Type': 'application/json'})
+        conn.getresponse().read()
+    conn.close()
+
+
+def export(port, fmt):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    conn.request('GET', f'/api/inventory/export?format={fmt}')
+    response = conn.getresponse()
+    size = 0
+    while True:
+        chunk = response.read(65536)
+        if not chunk:
+            break
+        size += len(chunk)
+    conn.close()
+    return size
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+
+        import server_5001
+        server_5001.init_db()
+        server_5001.warm_caches()
+        server = server_5001.POSServer(('127.0.0.1', 0), server_5001.POSHandler)
+        server.RequestHandlerClass.log_message = lambda *args: None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        _, elapsed = timed(per_item, port, PER_ITEM_SAMPLE)
+        print(f"per-item POST:      {PER_ITEM_SAMPLE / elapsed:>9.0f} rows/s "
+              f"(~{ROWS * elapsed / PER_ITEM_SAMPLE:.0f} s for {ROWS} rows)")
+
+        result, elapsed = timed(upload, port, '/api/inventory/bulk', price_list_csv(ROWS), 'text/csv')
+        print(f"bulk CSV insert:    {ROWS / elapsed:>9.0f} rows/s ({elapsed:.2f} s) "
+              f"inserted={result['inserted']} errors={result['error_count']}")
+
+        result, elapsed = timed(upload, port, '/api/inventory/bulk', price_list_csv(ROWS, 7), 'text/csv')
+        print(f"bulk CSV update:    {ROWS / elapsed:>9.0f} rows/s ({elapsed:.2f} s) "
+              f"updated={result['updated']} errors={result['error_count']}")
+
+        result, elapsed = timed(upload, port, '/api/inventory/bulk?format=ndjson', price_list_ndjson(ROWS),
+                                'application/x-ndjson')
+        print(f"bulk NDJSON update: {ROWS / elapsed:>9.0f} rows/s ({elapsed:.2f} s) "
+              f"updated={result['updated']}")
+
+        for fmt in ('csv', 'ndjson'):
+            size, elapsed = timed(export, port, fmt)
+            print(f"export {fmt:<7}     {size / 1e6:>9.1f} MB in {elapsed:.2f} s")
+
+        server.shutdown()
+        server.server_close()
+        os.chdir('/')
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Keep-Alive Benchmark
+Repeated small requests: a new TCP connection each time vs one persistent connection
+
+Runs the real POSHandler on a throwaway copy of the database and reports
+mean latency and CPU time per request (client and server share the process).
+Run from the repository root: python scripts/bench_keepalive.py
+"""
+
+import http.client
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend')
+sys.path.insert(0, BACKEND)
+
+REQUESTS = 2000
+PATH = '/api/inventory'
+
+
+def new_connection_each(port):
+    for _ in range(REQUESTS):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.request('GET', PATH)
+        conn.getresponse().read()
+        conn.close()
+
+
+def persistent(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    for _ in range(REQUESTS):
+        conn.request('GET', PATH)
+        response = conn.getresponse()
+        response.read()
+        assert not response.will_close, "server closed a keep-alive connection"
+    conn.close()
+
+
+def measure(fn, port):
+    wall, cpu = time.perf_counter(), time.process_time()
+    fn(port)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return wall * 1000 / REQUESTS, cpu * 1000 / REQUESTS
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copyfile(os.path.join(BACKEND, 'pos_system.db'), os.path.join(tmp, 'pos_system.db'))
+        os.chdir(tmp)
+
+        import server_5001
+        server_5001.init_db()
+        server_5001.warm_caches()
+        server = server_5001.POSServer(('127.0.0.1', 0), server_5001.POSHandler)
+        server.RequestHandlerClass.log_message = lambda *args: None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        print(f"{REQUESTS} x GET {PATH}")
+        print(f"{'connection':<14}{'latency ms':>12}{'cpu ms/req':>12}")
+        for name, fn in [('new each time', new_connection_each), ('keep-alive', persistent)]:
+            latency, cpu = measure(fn, port)
+            print(f"{name:<14}{latency:>12.3f}{cpu:>12.3f}")
+
+        server.shutdown()
+        server.server_close()
+        os.chdir('/')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sales Ledger Benchmark
+Compares dashboard analytics from the in-memory ledger with the SQLite queries
+
+Seeds a million sales over three years of a 5000-SKU catalog, then reports ledger load time, memory per
+million sales, and per-call latency of the credit score, 7/30-day summaries
+and top items on both paths. Run from the repository root: python scripts/bench_ledger.py
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+import pos_data
+from ledger import SalesLedger
+
+SALES = 1000000
+ITEMS = 5000
+DAYS = 3 * 365
+METHODS = ['cash', 'cash', 'snapscan', 'card']
+REPEAT = 20
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE sales (id INTEGER PRIMARY KEY, item_name TEXT, quantity INTEGER,
+                    total REAL, payment_method TEXT, amount_received REAL, change_given REAL, timestamp TEXT)''')
+    rng = random.Random(7)
+    start = datetime.now() - timedelta(days=DAYS)
+    step = DAYS * 86400 / SALES
+    rows = []
+    for i in range(SALES):
+        quantity = rng.randint(1, 5)
+        total = round(quantity * rng.uniform(5, 80), 2)
+        when = start + timedelta(seconds=i * step)
+        rows.append((f"Item {rng.randrange(ITEMS)}", quantity, total, rng.choice(METHODS),
+                     total, 0, when.isoformat()))
+    conn.executemany('''INSERT INTO sales (item_name, quantity, total, payment_method, amount_received,
+                        change_given, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.commit()
+    return conn
+
+
+def per_call_ms(fn, *args):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(*args)
+    return (time.perf_counter() - start) * 1000 / REPEAT
+
+
+def ledger_summary(ledger, days):
+    start = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+    summary = dict(days=days, **ledger.range_totals(start=start))
+    summary['top_items'] = ledger.top_items(days, 5)
+    return summary
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        t = time.perf_counter()
+        conn = seed(os.path.join(tmp, 'sales.db'))
+        print(f"seeded {SALES} sales in {time.perf_counter() - t:.1f} s")
+
+        ledger = SalesLedger()
+        t = time.perf_counter()
+        ledger.load(conn)
+        print(f"ledger load:   {time.perf_counter() - t:.2f} s")
+
+        # tracemalloc slows allocation-heavy code several times over, so measure on a second load
+        tracemalloc.start()
+        traced_ledger = SalesLedger()
+        traced_ledger.load(conn)
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del traced_ledger
+        # bytes per sale is the same number as MB per million sales
+        print(f"ledger memory: {ledger.memory_bytes() / SALES:.1f} MB per million sales in typed arrays, "
+              f"{traced / SALES:.1f} MB total (tracemalloc)")
+        checkpoint_bytes = sum(a.buffer_info()[1] * a.itemsize
+                               for a in ledger.checkpoint_qty + ledger.checkpoint_cents)
+        print(f"  of which {len(ledger.checkpoints)} weekly checkpoints x {ITEMS} items: "
+              f"{checkpoint_bytes / 1e6:.1f} MB")
+
+        sql_score = pos_data.get_credit_score(conn)
+        ledger_score = pos_data.score_business(*ledger.credit_inputs())
+        assert round(sql_score['total_sales'], 2) == round(ledger_score['total_sales'], 2), (sql_score, ledger_score)
+        assert {k: v for k, v in sql_score.items() if k not in ('total_sales', 'avg_transaction')} == \
+               {k: v for k, v in ledger_score.items() if k not in ('total_sales', 'avg_transaction')}
+
+        for days in (7, 30):
+            sql_summary = pos_data.get_sales_summary(conn, days)
+            summary = ledger_summary(ledger, days)
+            assert sql_summary['transaction_count'] == summary['transaction_count']
+            assert [i['units'] for i in sql_summary['top_items']] == [i['units'] for i in summary['top_items']]
+
+        cases = [
+            ("credit score", lambda: pos_data.get_credit_score(conn),
+             lambda: pos_data.score_business(*ledger.credit_inputs())),
+            ("7-day summary", lambda: pos_data.get_sales_summary(conn, 7), lambda: ledger_summary(ledger, 7)),
+            ("30-day summary", lambda: pos_data.get_sales_summary(conn, 30), lambda: ledger_summary(ledger, 30)),
+        ]
+        print(f"{'query':<16}{'sqlite ms':>12}{'ledger ms':>12}")
+        for name, sql_fn, ledger_fn in cases:
+            print(f"{name:<16}{per_call_ms(sql_fn):>12.2f}{per_call_ms(ledger_fn):>12.3f}")
+        conn.close()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Priority Scheduling Load Test
+Checkout latency while dashboard analytics saturates the server
+
+Runs the real POSHandler on a throwaway database with a large sales
+history, floods it with credit-score/sales-history requests and measures
+/api/sell latency with no analytics load (baseline), then with the scheduler
+off and on. Shed analytics clients wait out Retry-After like a well-behaved
+dashboard. Each configuration runs ROUNDS times so the spread is visible.
+Run from the repository root: python scripts/bench_priority.py
+"""
+
+import http.client
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+HISTORY_ROWS = 200000
+ANALYTICS_CLIENTS = 24
+CHECKOUT_SALES = 200
+ROUNDS = 3
+
+
+def seed(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE inventory (id INTEGER PRIMARY KEY, name TEXT, price REAL, quantity INTEGER)")
+    conn.execute('''CREATE TABLE sales (id INTEGER PRIMARY KEY, item_name TEXT, quantity INTEGER,
+                    total REAL, payment_method TEXT, amount_received REAL,
+                    change_given REAL, timestamp TEXT)''')
+    conn.execute("INSERT INTO inventory (name, price, quantity) VALUES ('Bread', 15.0, 1000000)")
+    rng = random.Random(7)
+    start = datetime.now() - timedelta(days=90)
+    rows = ((rng.choice(['Bread', 'Milk', 'Airtime']), 1, 15.0, rng.choice(['cash', 'card']),
+             15.0, 0.0, (start + timedelta(seconds=i * 30)).isoformat())
+            for i in range(HISTORY_ROWS))
+    conn.executemany('''INSERT INTO sales (item_name, quantity, total, payment_method,
+                        amount_received, change_given, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.commit()
+    conn.close()
+
+
+def request(port, method, path, body=None):
+    """(status, parsed JSON body, Retry-After seconds or None)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    payload = json.dumps(body) if body is not None else None
+    headers = {'Content-Type': 'application/json'} if payload else {}
+    conn.request(method, path, payload, headers)
+    response = conn.getresponse()
+    data = json.loads(response.read() or b'null')
+    conn.close()
+    retry_after = response.getheader('Retry-After')
+    return response.status, data, float(retry_after) if retry_after else None
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def run(port, scheduled, clients):
+    import scheduler
+    scheduler.enabled = scheduled
+    stop = threading.Event()
+    analytics = {"ok": 0, "shed": 0}
+    counts_lock = threading.Lock()
+
+    def dashboard():
+        while not stop.is_set():
+            path = random.choice(['/api/credit-score', '/api/sales-history'])
+            status, _, retry_after = request(port, 'GET', path)
+            with counts_lock:
+                analytics['shed' if status == 503 else 'ok'] += 1
+            if status == 503:
+                stop.wait(retry_after or 1)
+
+    threads = [threading.Thread(target=dashboard, daemon=True) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    if clients:
+        time.sleep(1)
+
+    latencies = []
+    for _ in range(CHECKOUT_SALES):
+        start = time.perf_counter()
+        status, data, _ = request(port, 'POST', '/api/sell',
+                                  {"item_name": "Bread", "quantity": 1, "payment_method": "cash"})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert status == 200 and 'error' not in data, (status, data)
+
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "analytics_ok": analytics['ok'],
+        "analytics_shed": analytics['shed']
+    }
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        seed('pos_system.db')
+
+        import server_5001
+        server_5001.init_db()
+        server_5001.warm_caches()
+        server = server_5001.POSServer(('127.0.0.1', 0), server_5001.POSHandler)
+        server.RequestHandlerClass.log_message = lambda *args: None
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        print(f"{ANALYTICS_CLIENTS} analytics clients over {HISTORY_ROWS} sales, {CHECKOUT_SALES} checkouts")
+        print(f"{'run':<20}{'sell p50 ms':>13}{'sell p99 ms':>13}{'analytics ok':>14}{'shed (503)':>12}")
+        runs = [("baseline (no load)", True, 0), ("scheduler off", False, ANALYTICS_CLIENTS),
+                ("scheduler on", True, ANALYTICS_CLIENTS)]
+        for name, scheduled, clients in runs:
+            for _ in range(ROUNDS):
+                r = run(port, scheduled, clients)
+                print(f"{name:<20}{r['p50']:>13.1f}{r['p99']:>13.1f}"
+                      f"{r['analytics_ok']:>14}{r['analytics_shed']:>12}")
+
+        server.shutdown()
+        server.server_close()
+        os.chdir('/')
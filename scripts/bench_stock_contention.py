@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Stock Contention Benchmark
+Many clients buying the same SKU at once: checks for overselling and throughput
+
+Compares the old check-then-act sale (SELECT stock, then UPDATE) with the
+single conditional UPDATE used by process_sale. The scarce run has less
+stock than attempts (overselling shows up there); the ample run measures
+throughput when every attempt succeeds.
+Run from the repository root: python scripts/bench_stock_contention.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'backend'))
+
+import stock
+
+CLIENTS = 32
+ATTEMPTS_PER_CLIENT = 50
+SCARCE_STOCK = 500
+AMPLE_STOCK = CLIENTS * ATTEMPTS_PER_CLIENT
+ITEM = 'Airtime R10'
+
+
+def setup(path, initial_stock):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE inventory (id INTEGER PRIMARY KEY, name TEXT, price REAL, quantity INTEGER)")
+    conn.execute('''CREATE TABLE sales (id INTEGER PRIMARY KEY, item_name TEXT, quantity INTEGER,
+                    total REAL, payment_method TEXT, amount_received REAL,
+                    change_given REAL, timestamp TEXT)''')
+    conn.execute("CREATE INDEX idx_inventory_name ON inventory(name)")
+    conn.execute("INSERT INTO inventory (name, price, quantity) VALUES (?, ?, ?)", (ITEM, 10.0, initial_stock))
+    conn.commit()
+    conn.close()
+
+
+def legacy_sale(conn):
+    c = conn.cursor()
+    c.execute("SELECT price, quantity FROM inventory WHERE name = ?", (ITEM,))
+    price, quantity = c.fetchone()
+    if quantity < 1:
+        return False
+    time.sleep(0)  # yield, as request handling would between the two statements
+    c.execute("UPDATE inventory SET quantity = quantity - 1 WHERE name = ?", (ITEM,))
+    c.execute("INSERT INTO sales (item_name, quantity, total, payment_method, timestamp) VALUES (?, 1, ?, 'cash', ?)",
+              (ITEM, price, datetime.now().isoformat()))
+    conn.commit()
+    return True
+
+
+def atomic_sale(conn):
+    with stock.write_transaction(conn) as c:
+        result = stock.take_stock(c, ITEM, 1)
+        if isinstance(result, str):
+            return False
+        c.execute("INSERT INTO sales (item_name, quantity, total, payment_method, timestamp) VALUES (?, 1, ?, 'cash', ?)",
+                  (ITEM, result[1], datetime.now().isoformat()))
+    return True
+
+
+def run(sale, isolation_level, initial_stock):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        setup(path, initial_stock)
+        errors = []
+
+        def client():
+            conn = sqlite3.connect(path, timeout=30, isolation_level=isolation_level,
+                                   check_same_thread=False)
+            for _ in range(ATTEMPTS_PER_CLIENT):
+                try:
+                    sale(conn)
+                except sqlite3.OperationalError as e:
+                    errors.append(str(e))
+            conn.close()
+
+        threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        conn = sqlite3.connect(path)
+        sold = conn.execute("SELECT COALESCE(SUM(quantity), 0) FROM sales").fetchone()[0]
+        remaining = conn.execute("SELECT quantity FROM inventory").fetchone()[0]
+        conn.close()
+
+    attempts = CLIENTS * ATTEMPTS_PER_CLIENT
+    return {
+        "sold": sold,
+        "remaining": remaining,
+        "oversold": max(sold - initial_stock, 0),
+        "errors": len(errors),
+        "attempts_per_s": attempts / elapsed
+    }
+
+
+if __name__ == '__main__':
+    print(f"{CLIENTS} clients x {ATTEMPTS_PER_CLIENT} attempts on one SKU")
+    print(f"{'run':<8}{'path':<16}{'sold':>8}{'remaining':>11}{'oversold':>10}{'errors':>8}{'attempts/s':>12}")
+    for label, initial_stock in [('scarce', SCARCE_STOCK), ('ample', AMPLE_STOCK)]:
+        for name, sale, isolation in [('check-then-act', legacy_sale, ''), ('atomic', atomic_sale, None)]:
+            r = run(sale, isolation, initial_stock)
+            print(f"{label:<8}{name:<16}{r['sold']:>8}{r['remaining']:>11}{r['oversold']:>10}"
+                  f"{r['errors']:>8}{r['attempts_per_s']:>12.0f}")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Online Backup
+Non-blocking SQLite snapshots with incremental page shipping and verified restore
+
+Usage:
+    python backup.py snapshot <backup_dir> [--full]
+    python backup.py restore <backup_dir> <dest.db> [--upto N]
+    python backup.py verify <backup_dir>
+
+A backup directory holds one full base copy followed by incremental files
+containing only the pages that changed since the previous snapshot.
+Stop the server before restoring over its live database.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+import time
+
+# Pages copied per backup step; the source lock is released between steps
+STEP_PAGES = 64
+STEP_SLEEP = 0.002
+
+MANIFEST = 'manifest.json'
+PAGE_HEADER = struct.Struct('>I')
+
+
+def online_copy(src_path, dest_path, pages=STEP_PAGES, sleep=STEP_SLEEP):
+    """Consistent copy of a live database via the SQLite backup API"""
+    src = sqlite3.connect(src_path, isolation_level=None)
+    dst = sqlite3.connect(dest_path)
+    try:
+        # Pin one read snapshot: in WAL mode writers carry on, and the backup
+        # is not restarted every time a sale commits
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=pages, sleep=sleep)
+        src.execute("COMMIT")
+    finally:
+        dst.close()
+        src.close()
+
+
+def _page_size(path):
+    with open(path, 'rb') as f:
+        header = f.read(100)
+    size = struct.unpack('>H', header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def _read_pages(path, page_size):
+    with open(path, 'rb') as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                break
+            yield page
+
+
+def _page_hash(page):
+    return hashlib.blake2b(page, digest_size=8).hexdigest()
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(backup_dir):
+    try:
+        with open(os.path.join(backup_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(backup_dir, manifest):
+    tmp_path = os.path.join(backup_dir, MANIFEST + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(backup_dir, MANIFEST))
+
+
+def snapshot(db_path, backup_dir, full=False):
+    """Ship a snapshot of db_path into backup_dir; returns the new chain entry"""
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    fd, copy_path = tempfile.mkstemp(suffix='.db', dir=backup_dir)
+    os.close(fd)
+
+    try:
+        online_copy(db_path, copy_path)
+        page_size = _page_size(copy_path)
+        manifest = load_manifest(backup_dir)
+        if full or not manifest or manifest['page_size'] != page_size:
+            manifest = None
+
+        hashes = []
+        changed = 0
+        if manifest is None:
+            name = f'base-{stamp}.db'
+            hashes = [_page_hash(page) for page in _read_pages(copy_path, page_size)]
+            changed = len(hashes)
+            os.replace(copy_path, os.path.join(backup_dir, name))
+            copy_path = None
+            manifest = {"page_size": page_size, "chain": []}
+        else:
+            name = f'incr-{stamp}-{len(manifest["chain"])}.pages'
+            previous = manifest['page_hashes']
+            with open(os.path.join(backup_dir, name + '.tmp'), 'wb') as out:
+                for number, page in enumerate(_read_pages(copy_path, page_size)):
+                    digest = _page_hash(page)
+                    hashes.append(digest)
+                    if number >= len(previous) or previous[number] != digest:
+                        out.write(PAGE_HEADER.pack(number))
+                        out.write(page)
+                        changed += 1
+            os.replace(os.path.join(backup_dir, name + '.tmp'), os.path.join(backup_dir, name))
+
+        entry = {
+            "file": name,
+            "pages": changed,
+            "page_count": len(hashes),
+            "sha256": _file_hash(os.path.join(backup_dir, name)) if name.startswith('base-')
+                      else _file_hash(copy_path),
+            "created": time.time()
+        }
+        manifest['chain'].append(entry)
+        manifest['page_hashes'] = hashes
+        _write_manifest(backup_dir, manifest)
+        return entry
+    finally:
+        if copy_path and os.path.exists(copy_path):
+            os.remove(copy_path)
+
+
+def rebuild(backup_dir, dest_path, upto=None):
+    """Replay base + incrementals into dest_path and check it against the manifest"""
+    manifest = load_manifest(backup_dir)
+    if not manifest or not manifest['chain']:
+        raise ValueError(f"No snapshots in {backup_dir}")
+    chain = manifest['chain'][:upto] if upto else manifest['chain']
+    page_size = manifest['page_size']
+
+    shutil.copyfile(os.path.join(backup_dir, chain[0]['file']), dest_path)
+    with open(dest_path, 'r+b') as db:
+        for entry in chain[1:]:
+            record = PAGE_HEADER.size + page_size
+            with open(os.path.join(backup_dir, entry['file']), 'rb') as incr:
+                for block in iter(lambda: incr.read(record), b''):
+                    number = PAGE_HEADER.unpack(block[:PAGE_HEADER.size])[0]
+                    db.seek(number * page_size)
+                    db.write(block[PAGE_HEADER.size:])
+            db.truncate(entry['page_count'] * page_size)
+
+    if _file_hash(dest_path) != chain[-1]['sha256']:
+        raise ValueError("Rebuilt database does not match the snapshot checksum")
+    conn = sqlite3.connect(dest_path)
+    result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    conn.close()
+    if result != 'ok':
+        raise ValueError(f"Integrity check failed: {result}")
+    return chain[-1]
+
+
+def restore(backup_dir, dest_path, upto=None):
+    """Verified restore: rebuild beside dest_path, then swap it in"""
+    tmp_path = dest_path + '.restore'
+    try:
+        entry = rebuild(backup_dir, tmp_path, upto)
+        # A stale WAL from the old database would be replayed over the restored one
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(dest_path + suffix):
+                os.remove(dest_path + suffix)
+        os.replace(tmp_path, dest_path)
+        return entry
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def verify(backup_dir):
+    fd, tmp_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        return rebuild(backup_dir, tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='POS database backup')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('snapshot')
+    p.add_argument('backup_dir')
+    p.add_argument('--db', default='pos_system.db')
+    p.add_argument('--full', action='store_true')
+    p = sub.add_parser('restore')
+    p.add_argument('backup_dir')
+    p.add_argument('dest')
+    p.add_argument('--upto', type=int)
+    p = sub.add_parser('verify')
+    p.add_argument('backup_dir')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'snapshot':
+            entry = snapshot(args.db, args.backup_dir, args.full)
+            print(f"Wrote {entry['file']}: {entry['pages']} of {entry['page_count']} pages")
+        elif args.command == 'restore':
+            entry = restore(args.backup_dir, args.dest, args.upto)
+            print(f"Restored {args.dest} to snapshot {entry['file']}")
+        else:
+            entry = verify(args.backup_dir)
+            print(f"Backup chain OK up to {entry['file']}")
+    except (ValueError, sqlite3.Error, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Bulk Inventory Import/Export
+Streams CSV or NDJSON price lists in and out of the inventory table
+
+Rows are parsed as the upload arrives and upserted by item name in
+batched transactions; bad rows are reported without aborting the import.
+"""
+
+import csv
+import io
+import json
+import math
+
+import search_index
+import stock
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ('csv', 'ndjson')
+# SQLite integers are signed 64-bit
+MAX_QUANTITY = 2 ** 63 - 1
+
+
+def body_lines(rfile, headers):
+    """Decoded lines of a request body, read incrementally (Content-Length or chunked)"""
+    if headers.get('Transfer-Encoding', '').lower() == 'chunked':
+        lines = _split_lines(_chunks(rfile))
+    else:
+        lines = _read_lines(rfile, int(headers.get('Content-Length') or 0))
+    first = True
+    for line in lines:
+        if first:
+            # Spreadsheet exports often start with a byte order mark
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def _read_lines(rfile, remaining):
+    while remaining > 0:
+        line = rfile.readline(min(remaining, 65536))
+        if not line:
+            break
+        remaining -= len(line)
+        yield line.decode('utf-8', errors='replace')
+
+
+def _chunks(rfile):
+    while True:
+        size = int(rfile.readline().split(b';')[0].strip() or b'0', 16)
+        if size == 0:
+            # Trailers end with an empty line
+            while rfile.readline().strip():
+                pass
+            return
+        yield rfile.read(size)
+        rfile.readline()
+
+
+def _split_lines(chunks):
+    pending = b''
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b'\n')
+        for line in lines:
+            yield line.decode('utf-8', errors='replace') + '\n'
+    if pending:
+        yield pending.decode('utf-8', errors='replace')
+
+
+def parse_rows(lines, fmt):
+    """Yield (line_number, item) or (line_number, error message)"""
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        if reader.fieldnames:
+            reader.fieldnames = [field.strip().lower() for field in reader.fieldnames]
+        for row in reader:
+            yield reader.line_num, _validate(row)
+    else:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield number, "Invalid JSON"
+                continue
+            yield number, _validate(row) if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _validate(row):
+    name = str(row.get('name') or '').strip()
+    if not name:
+        return "Missing name"
+    try:
+        price = float(row['price'])
+    except (KeyError, TypeError, ValueError):
+        return "Invalid price"
+    if not math.isfinite(price):
+        return "Invalid price"
+    if price < 0:
+        return "Negative price"
+
+    quantity = row.get('quantity')
+    if quantity in (None, ''):
+        quantity = None
+    else:
+        try:
+            quantity = _whole_number(quantity)
+        except (TypeError, ValueError, OverflowError):
+            return "Invalid quantity"
+        if quantity < 0:
+            return "Negative quantity"
+        if quantity > MAX_QUANTITY:
+            return "Quantity too large"
+    return {"name": name, "price": price, "quantity": quantity}
+
+
+def _whole_number(value):
+    """int() exactly for integer text, falling back to float for values like '5.0' or '1e3'"""
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def import_rows(conn, rows, add_quantity=False, batch_size=BATCH_SIZE):
+    """Upsert parsed rows by name, one write transaction per batch.
+
+    `conn` must be opened with isolation_level=None. New items without a
+    quantity start at 0; for existing items quantity is replaced, or added
+    to stock when add_quantity is set.
+    """
+    summary = {"inserted": 0, "updated": 0, "error_count": 0, "errors": []}
+    batch = {}
+    batches = 0
+    fts_suspended = False
+    try:
+        for number, item in rows:
+            if isinstance(item, str):
+                summary['error_count'] += 1
+                if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                    summary['errors'].append({"line": number, "error": item})
+                continue
+            _merge(batch, item, add_quantity)
+            if len(batch) >= batch_size:
+                if batches == 1:
+                    # Per-row FTS triggers dominate large loads; rebuild once at the end instead
+                    fts_suspended = search_index.suspend_fts(conn)
+                _write_batch(conn, batch, add_quantity, summary)
+                batches += 1
+                batch = {}
+        if batch:
+            _write_batch(conn, batch, add_quantity, summary)
+    finally:
+        if fts_suspended:
+            search_index.enable_fts(conn)
+    return summary
+
+
+def _merge(batch, item, add_quantity):
+    """Fold a row into the batch as if it were written after the earlier rows for its name"""
+    earlier = batch.get(item['name'])
+    if earlier is None:
+        batch[item['name']] = item
+        return
+    earlier['price'] = item['price']
+    if item['quantity'] is None:
+        return
+    if add_quantity and earlier['quantity'] is not None:
+        earlier['quantity'] += item['quantity']
+    else:
+        earlier['quantity'] = item['quantity']
+
+
+def _write_batch(conn, batch, add_quantity, summary):
+    names = list(batch)
+    with stock.write_transaction(conn) as c:
+        existing = set()
+        for i in range(0, len(names), 500):
+            part = names[i:i + 500]
+            c.execute(f"SELECT name FROM inventory WHERE name IN ({','.join('?' * len(part))})", part)
+            existing.update(row[0] for row in c.fetchall())
+
+        updates = [batch[n] for n in names if n in existing]
+        inserts = [batch[n] for n in names if n not in existing]
+
+        quantity_sql = "quantity + ?" if add_quantity else "?"
+        c.executemany(f"UPDATE inventory SET price = ?, quantity = COALESCE({quantity_sql}, quantity) WHERE name = ?",
+                      [(item['price'], item['quantity'], item['name']) for item in updates])
+        c.executemany("INSERT INTO inventory (name, price, quantity) VALUES (?, ?, ?)",
+                      [(item['name'], item['price'], item['quantity'] or 0) for item in inserts])
+
+    summary['updated'] += len(updates)
+    summary['inserted'] += len(inserts)
+
+
+def export_rows(conn, fmt, fetch_size=BATCH_SIZE):
+    """Encoded chunks of the whole catalog, read from a cursor a batch at a time"""
+    c = conn.cursor()
+    c.execute("SELECT id, name, price, quantity FROM inventory ORDER BY id")
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['id', 'name', 'price', 'quantity'])
+    while True:
+        rows = c.fetchmany(fetch_size)
+        if not rows:
+            break
+        if fmt == 'csv':
+            writer.writerows(rows)
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        else:
+            chunk = ''.join(json.dumps({"id": r[0], "name": r[1], "price": r[2], "quantity": r[3]}) + '\n'
+                            for r in rows)
+        yield chunk.encode()
+    if fmt == 'csv' and buffer.getvalue():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Stock Velocity Forecasting
+Keeps an exponentially weighted sales rate per item and estimates days of cover
+
+Usage: python forecasting.py backfill   # rebuild velocity state from sales history
+"""
+
+import math
+import sqlite3
+import sys
+from datetime import datetime
+
+import stock
+
+# Sales older than this many days carry half the weight of today's sales
+HALF_LIFE_DAYS = 7.0
+TAU_DAYS = HALF_LIFE_DAYS / math.log(2)
+
+# Reorder when stock covers fewer days than this
+DEFAULT_LEAD_DAYS = 3
+# Suggested reorder quantity brings stock up to this many days of cover
+DEFAULT_TARGET_DAYS = 14
+# Below this many units per day an item is treated as not selling
+MIN_VELOCITY = 0.01
+
+
+def init_velocity_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS stock_velocity
+                    (item_name TEXT PRIMARY KEY, rate REAL, last_ts REAL)''')
+
+
+def _days(timestamp):
+    """ISO timestamp (or datetime) to fractional days since the epoch"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return timestamp.timestamp() / 86400.0
+
+
+def _advance(rate, last_ts, quantity, ts):
+    """Decay the rate to `ts` and add a sale of `quantity`; units per day"""
+    if last_ts is None:
+        return quantity / TAU_DAYS, ts
+    if ts < last_ts:
+        # Out-of-order sale: weight it as if it happened at last_ts
+        return rate + quantity * math.exp((ts - last_ts) / TAU_DAYS) / TAU_DAYS, last_ts
+    return rate * math.exp((last_ts - ts) / TAU_DAYS) + quantity / TAU_DAYS, ts
+
+
+def record_sale(conn, item_name, quantity, timestamp):
+    """O(1) velocity update; call inside the sale transaction"""
+    ts = _days(timestamp)
+    c = conn.cursor()
+    c.execute("SELECT rate, last_ts FROM stock_velocity WHERE item_name = ?", (item_name,))
+    row = c.fetchone()
+    rate, last_ts = _advance(row[0] if row else 0.0, row[1] if row else None, quantity, ts)
+    c.execute("INSERT OR REPLACE INTO stock_velocity (item_name, rate, last_ts) VALUES (?, ?, ?)",
+              (item_name, rate, last_ts))
+
+
+def current_rate(rate, last_ts, now=None):
+    """Velocity decayed to `now` (units per day)"""
+    if not rate or last_ts is None:
+        return 0.0
+    now = _days(now or datetime.now())
+    return rate * math.exp(min(last_ts - now, 0) / TAU_DAYS)
+
+
+def reorder_report(conn, lead_days=DEFAULT_LEAD_DAYS, target_days=DEFAULT_TARGET_DAYS):
+    """Days of cover and reorder suggestion for every inventory item"""
+    c = conn.cursor()
+    c.execute('''SELECT i.id, i.name, i.quantity, v.rate, v.last_ts FROM inventory i
+                 LEFT JOIN stock_velocity v ON v.item_name = i.name''')
+    now = datetime.now()
+    report = []
+    for item_id, name, quantity, rate, last_ts in c.fetchall():
+        velocity = current_rate(rate, last_ts, now)
+        if velocity < MIN_VELOCITY:
+            velocity = 0.0
+        quantity = quantity or 0
+        days_of_cover = quantity / velocity if velocity > 0 else None
+        if days_of_cover is None:
+            reorder = quantity <= 0
+        else:
+            reorder = days_of_cover < lead_days
+        suggested = max(math.ceil(velocity * target_days - quantity), 0) if reorder else 0
+        report.append({
+            "id": item_id,
+            "name": name,
+            "quantity": quantity,
+            "daily_velocity": round(velocity, 3),
+            "days_of_cover": round(days_of_cover, 1) if days_of_cover is not None else None,
+            "reorder": reorder,
+            "suggested_quantity": suggested
+        })
+
+    # Most urgent first; items that never sell go last
+    report.sort(key=lambda r: (not r['reorder'],
+                               r['days_of_cover'] if r['days_of_cover'] is not None else float('inf')))
+    return report
+
+
+def _replay(rows, state):
+    """Fold (id, item_name, quantity, timestamp) sales into state; returns (count, max id)"""
+    count = max_id = 0
+    for sale_id, item_name, quantity, timestamp in rows:
+        max_id = max(max_id, sale_id)
+        try:
+            ts = _days(timestamp)
+        except (TypeError, ValueError):
+            continue
+        rate, last_ts = state.get(item_name, (0.0, None))
+        state[item_name] = _advance(rate, last_ts, quantity or 0, ts)
+        count += 1
+    return count, max_id
+
+
+def backfill(conn):
+    """Rebuild stock_velocity from the sales table in one streaming pass
+
+    The scan runs without the write lock, so the server can keep selling;
+    sales committed meanwhile (ids above the scan's) are folded in under the
+    lock before the table is replaced.
+    """
+    init_velocity_table(conn)
+    state = {}
+    c = conn.cursor()
+    c.execute("SELECT id, item_name, quantity, timestamp FROM sales ORDER BY timestamp")
+    count, max_id = _replay(c, state)
+
+    with stock.write_transaction(conn) as c:
+        c.execute("SELECT id, item_name, quantity, timestamp FROM sales WHERE id > ? ORDER BY timestamp",
+                  (max_id,))
+        count += _replay(c.fetchall(), state)[0]
+        c.execute("DELETE FROM stock_velocity")
+        c.executemany("INSERT INTO stock_velocity (item_name, rate, last_ts) VALUES (?, ?, ?)",
+                      [(name, rate, last_ts) for name, (rate, last_ts) in state.items()])
+    return count, len(state)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print(__doc__)
+        sys.exit(1)
+
+    conn = sqlite3.connect('pos_system.db', isolation_level=None)
+    sales, items = backfill(conn)
+    conn.close()
+    print(f"Rebuilt velocity for {items} items from {sales} sales")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Sales Ledger
+Compact in-memory columnar copy of the sales table for dashboard analytics
+
+Sales are held in typed arrays ordered by time, with running totals so a
+range aggregate is two binary searches. Per-item units and revenue are kept
+as sparse per-day deltas plus a dense running total at each week boundary,
+so top items over any window subtract two checkpoints and add at most a
+week of deltas on each side. Enable with POS_LEDGER=1.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from heapq import nlargest
+from itertools import accumulate
+from operator import sub
+
+# Days between dense per-item checkpoints; memory is (days / this) x items
+CHECKPOINT_DAYS = 7
+
+
+class SalesLedger:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Sales recorded while load() is reading are queued rather than blocking checkout
+        self._pending_lock = threading.Lock()
+        self._pending = []
+        self._loading = False
+        self._reset()
+        self.ready = False
+
+    def _reset(self):
+        self.loaded_max_id = 0           # highest sales.id read by load()
+
+        self.ts = array('d')             # epoch seconds, ascending
+        self.item = array('I')           # index into item_names
+        self.qty = array('i')
+        self.cents = array('q')
+        self.method = array('B')         # index into method_names
+
+        # Running totals up to and including each row
+        self.cum_cents = array('q')
+        self.cum_qty = array('q')
+        self.cum_digital = array('I')
+
+        self.item_names = []
+        self.method_names = []
+        self._item_codes = {}
+        self._method_codes = {}
+        self.active_days = []            # sorted distinct day ordinals
+        self.day_deltas = {}             # day ordinal -> (item codes, units, cents) sold that day
+        # Week boundaries (day ordinals) holding units and cents by item code for all earlier days
+        self.checkpoints = []
+        self.checkpoint_qty = []
+        self.checkpoint_cents = []
+
+    def load(self, conn, fetch_size=10000):
+        """Stream the sales table into the ledger; returns the number of rows"""
+        with self._pending_lock:
+            self._loading = True
+            self._pending = []
+        with self._lock:
+            self._reset()
+            days = array('i')
+            item_codes, method_codes = self._item_codes, self._method_codes
+            append_ts, append_day = self.ts.append, days.append
+            append_item, append_qty = self.item.append, self.qty.append
+            append_cents, append_method = self.cents.append, self.method.append
+            in_order = True
+            last_ts = float('-inf')
+
+            c = conn.cursor()
+            c.execute('''SELECT id, item_name, quantity, total, payment_method, timestamp
+                         FROM sales ORDER BY timestamp, id''')
+            while True:
+                rows = c.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for sale_id, item_name, quantity, total, method, timestamp in rows:
+                    try:
+                        when = datetime.fromisoformat(timestamp)
+                    except (TypeError, ValueError):
+                        continue
+                    ts = when.timestamp()
+                    if ts < last_ts:
+                        in_order = False
+                    last_ts = ts
+                    item = item_codes.get(item_name)
+                    if item is None:
+                        item = self._code(item_codes, self.item_names, item_name)
+                    method_code = method_codes.get(method)
+                    if method_code is None:
+                        method_code = self._code(method_codes, self.method_names, method)
+                    append_ts(ts)
+                    append_day(when.toordinal())
+                    append_item(item)
+                    append_qty(quantity or 0)
+                    append_cents(int(round((total or 0) * 100)))
+                    append_method(method_code)
+                    if sale_id > self.loaded_max_id:
+                        self.loaded_max_id = sale_id
+
+            if not in_order:
+                # Text order differs from time order (mixed formats or a DST change)
+                order = sorted(range(len(self.ts)), key=self.ts.__getitem__)
+                for column in (self.ts, days, self.item, self.qty, self.cents, self.method):
+                    column[:] = array(column.typecode, [column[i] for i in order])
+
+            self._recompute_totals(0)
+            self._load_day_totals(days)
+
+            with self._pending_lock:
+                for sale in self._pending:
+                    self._append_sale(*sale)
+                self._pending = []
+                self._loading = False
+            self.ready = True
+            return len(self.ts)
+
+    def append(self, sale_id, timestamp, item_name, quantity, total, payment_method):
+        """Add a committed sale; ids already read by load() are ignored.
+
+        Concurrent sales may arrive in any order, so only the load's high-water
+        mark is used to drop duplicates.
+        """
+        sale = (sale_id, timestamp, item_name, quantity, total, payment_method)
+        with self._pending_lock:
+            if self._loading:
+                self._pending.append(sale)
+                return
+        with self._lock:
+            self._append_sale(*sale)
+
+    def _append_sale(self, sale_id, timestamp, item_name, quantity, total, payment_method):
+        if sale_id > self.loaded_max_id:
+            self._append(datetime.fromisoformat(timestamp), item_name, quantity, total, payment_method)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def memory_bytes(self):
+        """Bytes held by the typed arrays (sale columns, day deltas and checkpoints)"""
+        columns = [self.ts, self.item, self.qty, self.cents, self.method,
+                   self.cum_cents, self.cum_qty, self.cum_digital]
+        columns += self.checkpoint_qty + self.checkpoint_cents
+        for deltas in self.day_deltas.values():
+            columns += deltas
+        return sum(col.buffer_info()[1] * col.itemsize for col in columns)
+
+    def range_totals(self, start=None, end=None):
+        """Revenue, units and transaction count for sales with start <= time < end"""
+        with self._lock:
+            lo = bisect_left(self.ts, start.timestamp()) if start else 0
+            hi = bisect_left(self.ts, end.timestamp()) if end else len(self.ts)
+            if hi <= lo:
+                return {"total_sales": 0, "units": 0, "transaction_count": 0, "digital_count": 0}
+            return {
+                "total_sales": self._sum(self.cum_cents, lo, hi) / 100,
+                "units": self._sum(self.cum_qty, lo, hi),
+                "transaction_count": hi - lo,
+                "digital_count": self._sum(self.cum_digital, lo, hi)
+            }
+
+    def top_items(self, days=7, limit=5, today=None):
+        """Best sellers by units over the last `days` calendar days"""
+        today = (today or datetime.now()).toordinal()
+        with self._lock:
+            names = self.item_names
+            units = list(map(sub, self._units_before(today + 1), self._units_before(today - days + 1)))
+            ranked = [code for code in nlargest(limit, range(len(units)), key=units.__getitem__)
+                      if units[code]]
+            # Revenue is only needed for the items being returned
+            revenue = self._cents_before(today + 1, ranked)
+            earlier = self._cents_before(today - days + 1, ranked)
+        return [{"item_name": names[code], "units": units[code],
+                 "revenue": (revenue[code] - earlier[code]) / 100}
+                for code in ranked]
+
+    def credit_inputs(self):
+        """The aggregates get_credit_score reads from SQL"""
+        # Same window as SQLite's date('now', '-30 days'), which is UTC
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=30)).date().toordinal()
+        with self._lock:
+            n = len(self.ts)
+            return (self.cum_cents[-1] / 100 if n else 0,
+                    n,
+                    self.cum_digital[-1] if n else 0,
+                    len(self.active_days) - bisect_left(self.active_days, cutoff))
+
+    def _sum(self, cumulative, lo, hi):
+        return cumulative[hi - 1] - (cumulative[lo - 1] if lo else 0)
+
+    def _code(self, codes, names, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _append(self, when, item_name, quantity, total, method):
+        ts = when.timestamp()
+        day = when.toordinal()
+        item = self._code(self._item_codes, self.item_names, item_name)
+        method_code = self._code(self._method_codes, self.method_names, method)
+        cents = int(round(total * 100))
+
+        position = len(self.ts)
+        if position and ts < self.ts[-1]:
+            # Concurrent sales can arrive out of order: keep time order and redo the totals after it
+            position = bisect_right(self.ts, ts)
+        for column, value in ((self.ts, ts), (self.item, item), (self.qty, quantity),
+                              (self.cents, cents), (self.method, method_code)):
+            column.insert(position, value)
+        self._recompute_totals(position)
+
+        boundary = self._week_end(day)
+        i = bisect_left(self.checkpoints, boundary)
+        if i == len(self.checkpoints) or self.checkpoints[i] != boundary:
+            # First sale of its week: start from everything sold before that week ends
+            units = self._units_before(boundary)
+            revenue = self._cents_before(boundary, range(len(units)))
+            self.checkpoints.insert(i, boundary)
+            self.checkpoint_qty.insert(i, array('q', units))
+            self.checkpoint_cents.insert(i, array('q', revenue.values()))
+        # Normally only this week's checkpoint; a back-dated sale also shifts the later ones
+        for j in range(i, len(self.checkpoints)):
+            self._add_to_checkpoint(j, item, quantity, cents)
+
+        if day not in self.day_deltas:
+            self.active_days.insert(bisect_left(self.active_days, day), day)
+            self.day_deltas[day] = (array('I'), array('q'), array('q'))
+        codes, day_qty, day_cents = self.day_deltas[day]
+        try:
+            k = codes.index(item)
+        except ValueError:
+            k = len(codes)
+            codes.append(item)
+            day_qty.append(0)
+            day_cents.append(0)
+        day_qty[k] += quantity
+        day_cents[k] += cents
+
+    def _add_to_checkpoint(self, j, item, quantity, cents):
+        checkpoint_qty, checkpoint_cents = self.checkpoint_qty[j], self.checkpoint_cents[j]
+        if item >= len(checkpoint_qty):
+            padding = [0] * (item + 1 - len(checkpoint_qty))
+            checkpoint_qty.extend(padding)
+            checkpoint_cents.extend(padding)
+        checkpoint_qty[item] += quantity
+        checkpoint_cents[item] += cents
+
+    @staticmethod
+    def _week_end(day):
+        return (day // CHECKPOINT_DAYS + 1) * CHECKPOINT_DAYS
+
+    def _nearest_checkpoint(self, day):
+        """How to total sales before `day`: (checkpoint index or -1, sign, day deltas to apply)"""
+        # Every week with sales has a checkpoint, so the nearest one on either side
+        # is at most a week of deltas away; windows ending today usually need none
+        after = bisect_left(self.checkpoints, day)
+        if after < len(self.checkpoints) and self.checkpoints[after] == day:
+            return after, 1, []
+        lo = bisect_left(self.active_days, self.checkpoints[after - 1]) if after else 0
+        mid = bisect_left(self.active_days, day)
+        if after < len(self.checkpoints):
+            hi = bisect_left(self.active_days, self.checkpoints[after])
+            if hi - mid < mid - lo:
+                return after, -1, self.active_days[mid:hi]
+        return after - 1, 1, self.active_days[lo:mid]
+
+    def _units_before(self, day):
+        """Units by item code for all sales on days before `day`"""
+        checkpoint, sign, days = self._nearest_checkpoint(day)
+        units = list(self.checkpoint_qty[checkpoint]) if checkpoint >= 0 else []
+        units.extend([0] * (len(self.item_names) - len(units)))
+        for d in days:
+            codes, day_qty, _ = self.day_deltas[d]
+            for code, quantity in zip(codes, day_qty):
+                units[code] += sign * quantity
+        return units
+
+    def _cents_before(self, day, wanted):
+        """Revenue in cents before `day` for just the item codes in `wanted`"""
+        checkpoint, sign, days = self._nearest_checkpoint(day)
+        cents = self.checkpoint_cents[checkpoint] if checkpoint >= 0 else ()
+        totals = {code: cents[code] if code < len(cents) else 0 for code in wanted}
+        for d in days:
+            codes, _, day_cents = self.day_deltas[d]
+            for code, value in zip(codes, day_cents):
+                if code in totals:
+                    totals[code] += sign * value
+        return totals
+
+    def _load_day_totals(self, days):
+        """Build day deltas and weekly checkpoints from time-ordered columns"""
+        size = len(self.item_names)
+        running_qty = array('q', bytes(8 * size))
+        running_cents = array('q', bytes(8 * size))
+        current = None
+        sold = {}
+        for day, item, quantity, cents in zip(days, self.item, self.qty, self.cents):
+            if day != current:
+                if current is not None:
+                    self._close_day(current, sold)
+                    if day >= self._week_end(current):
+                        self._add_checkpoint(self._week_end(current), running_qty, running_cents)
+                current = day
+                sold = {}
+            running_qty[item] += quantity
+            running_cents[item] += cents
+            entry = sold.get(item)
+            if entry is None:
+                sold[item] = [quantity, cents]
+            else:
+                entry[0] += quantity
+                entry[1] += cents
+        if current is not None:
+            self._close_day(current, sold)
+            self._add_checkpoint(self._week_end(current), running_qty, running_cents)
+
+    def _close_day(self, day, sold):
+        self.active_days.append(day)
+        self.day_deltas[day] = (array('I', sold),
+                                array('q', (entry[0] for entry in sold.values())),
+                                array('q', (entry[1] for entry in sold.values())))
+
+    def _add_checkpoint(self, boundary, running_qty, running_cents):
+        self.checkpoints.append(boundary)
+        self.checkpoint_qty.append(array('q', running_qty))
+        self.checkpoint_cents.append(array('q', running_cents))
+
+    def _recompute_totals(self, start):
+        del self.cum_cents[start:], self.cum_qty[start:], self.cum_digital[start:]
+        cash = self._method_codes.get('cash')
+        for cumulative, values in ((self.cum_cents, self.cents[start:]),
+                                   (self.cum_qty, self.qty[start:]),
+                                   (self.cum_digital, (m != cash for m in self.method[start:]))):
+            running = accumulate(values, initial=cumulative[-1] if start else 0)
+            next(running)
+            cumulative.extend(running)
@@ -5,11 +5,30 @@ Handles real payment processing with South African payment providers
 """
 
 import hashlib
-import requests
 import json
 import os
 from datetime import datetime
 
+_config_loaded = False
+
+def load_env(path='.env'):
+    """Load configuration from .env file once per process"""
+    global _config_loaded
+    if _config_loaded:
+        return
+    _config_loaded = True
+    try:
+        with open(path, 'r') as f:
+            content = f.read()
+    except FileNotFoundError:
+        print("Warning: .env file not found. Using default/demo values.")
+        print("Create .env file from .env.example for production use.")
+        return
+    for line in content.splitlines():
+        if '=' in line and not line.startswith('#'):
+            key, value = line.strip().split('=', 1)
+            os.environ[key] = value
+
 class PaymentService:
     def __init__(self):
         # Load environment variables
@@ -38,15 +57,7 @@ class PaymentService:
     
     def load_config(self):
         """Load configuration from .env file"""
-        try:
-            with open('.env', 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        os.environ[key] = value
-        except FileNotFoundError:
-            print("Warning: .env file not found. Using default/demo values.")
-            print("Create .env file from .env.example for production use.")
+        load_env()
 
     def process_payfast_payment(self, amount, item_description, customer_email="customer@example.com"):
         """Process payment through PayFast"""
@@ -139,6 +150,9 @@ class PaymentService:
             'targetMsisdn': None
         }
         
+        # Provider SDKs are only imported when that provider is used
+        import requests
+        
         try:
             response = requests.post(
                 f"{self.snapscan_url}/payments",
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+POS Data Access
+Queries and credit scoring shared by server_5001.py and the Vercel functions in api/
+"""
+
+from datetime import datetime, timedelta
+
+
+def get_inventory(conn):
+    c = conn.cursor()
+    c.execute("SELECT id, name, price, quantity FROM inventory")
+    return [{"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]}
+            for row in c.fetchall()]
+
+
+def add_inventory(conn, name, price, quantity):
+    """Insert an item and return its new id"""
+    c = conn.cursor()
+    c.execute("INSERT INTO inventory (name, price, quantity) VALUES (?, ?, ?)",
+              (name, price, quantity))
+    conn.commit()
+    return c.lastrowid
+
+
+def get_credit_score(conn):
+    c = conn.cursor()
+
+    c.execute("SELECT SUM(total), COUNT(*) FROM sales")
+    result = c.fetchone()
+    total_sales, transaction_count = result[0] or 0, result[1] or 0
+
+    # Calculate digital payment adoption
+    c.execute("SELECT COUNT(*) FROM sales WHERE payment_method != 'cash'")
+    digital_count = c.fetchone()[0]
+
+    # Calculate consistency (sales in last 30 days)
+    c.execute("SELECT COUNT(DISTINCT date(timestamp)) FROM sales WHERE date(timestamp) >= date('now', '-30 days')")
+    active_days = c.fetchone()[0]
+
+    return score_business(total_sales, transaction_count, digital_count, active_days)
+
+
+def score_business(total_sales, transaction_count, digital_count, active_days):
+    """Credit score from sales aggregates"""
+    digital_adoption = (digital_count / transaction_count * 100) if transaction_count else 0
+    avg_transaction = total_sales / transaction_count if transaction_count else 0
+
+    # More challenging scoring algorithm
+    # Sales Volume (25%) - requires R5000+ for full points
+    sales_score = min(total_sales / 5000 * 25, 25)
+
+    # Transaction Frequency (25%) - requires 100+ transactions for full points
+    frequency_score = min(transaction_count / 100 * 25, 25)
+
+    # Average Transaction (20%) - requires R50+ avg for full points
+    avg_score = min(avg_transaction / 50 * 20, 20)
+
+    # Digital Adoption (15%) - requires 50%+ digital payments
+    digital_score = min(digital_adoption / 50 * 15, 15)
+
+    # Business Consistency (15%) - requires 20+ active days per month
+    consistency_score = min(active_days / 20 * 15, 15)
+
+    final_score = int(sales_score + frequency_score + avg_score + digital_score + consistency_score)
+
+    return {
+        "score": final_score,
+        "total_sales": total_sales,
+        "transaction_count": transaction_count,
+        "avg_transaction": avg_transaction,
+        "digital_adoption": digital_adoption,
+        "active_days": active_days
+    }
+
+
+def get_sales_summary(conn, days=7, limit=5):
+    """Totals and best sellers since the start of the day `days - 1` days ago"""
+    start = (datetime.now().date() - timedelta(days=days - 1)).isoformat()
+    c = conn.cursor()
+    c.execute('''SELECT COALESCE(SUM(total), 0), COALESCE(SUM(quantity), 0), COUNT(*),
+                        COALESCE(SUM(payment_method != 'cash'), 0)
+                 FROM sales WHERE timestamp >= ?''', (start,))
+    total_sales, units, transaction_count, digital_count = c.fetchone()
+    c.execute('''SELECT item_name, SUM(quantity) AS units, SUM(total) FROM sales
+                 WHERE timestamp >= ? GROUP BY item_name ORDER BY units DESC LIMIT ?''', (start, limit))
+    top_items = [{"item_name": row[0], "units": row[1], "revenue": row[2]} for row in c.fetchall()]
+    return {
+        "days": days,
+        "total_sales": total_sales,
+        "units": units,
+        "transaction_count": transaction_count,
+        "digital_count": digital_count,
+        "top_items": top_items
+    }
+
+
+def get_sales_history(conn, limit=50):
+    c = conn.cursor()
+
+    c.execute("SELECT * FROM sales ORDER BY timestamp DESC LIMIT ?", (limit,))
+    sales = []
+    for row in c.fetchall():
+        if len(row) >= 8:
+            sales.append({
+                "id": row[0], "item_name": row[1], "quantity": row[2],
+                "total": row[3], "payment_method": row[4],
+                "amount_received": row[5], "change_given": row[6],
+                "timestamp": row[7]
+            })
+        else:
+            sales.append({
+                "id": row[0], "item_name": row[1], "quantity": row[2],
+                "total": row[3], "payment_method": row[4],
+                "timestamp": row[5]
+            })
+    return sales
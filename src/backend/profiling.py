@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Request Profiling
+Runtime-toggleable request sampling under cProfile and slow SQL capture
+
+Everything is off by default; when off, profile_request() and connect()
+cost one flag check each.
+"""
+
+import cProfile
+import math
+import pstats
+import random
+import sqlite3
+import threading
+import time
+import traceback
+from collections import deque
+
+enabled = False
+sample_rate = 0.1       # fraction of requests run under the profiler
+slow_query_ms = 50.0    # SQL statements slower than this are recorded
+
+_lock = threading.Lock()
+# Held by the one request currently under the profiler
+_profile_lock = threading.Lock()
+_stats = None
+_sampled = {}           # path -> sampled request count
+_slow_queries = deque(maxlen=200)
+
+
+def configure(enable=None, rate=None, threshold_ms=None):
+    """Change settings; raises ValueError (and changes nothing) on a non-numeric rate or threshold"""
+    global enabled, sample_rate, slow_query_ms
+    rate = _number(rate, 'sample_rate')
+    threshold_ms = _number(threshold_ms, 'slow_query_ms')
+    if rate is not None:
+        sample_rate = min(max(rate, 0.0), 1.0)
+    if threshold_ms is not None:
+        slow_query_ms = max(threshold_ms, 0.0)
+    if enable is not None:
+        enabled = bool(enable)
+    return status()
+
+
+def _number(value, name):
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a number")
+    return value
+
+
+def toggle():
+    return configure(enable=not enabled)
+
+
+def reset():
+    global _stats
+    with _lock:
+        _stats = None
+        _sampled.clear()
+        _slow_queries.clear()
+
+
+def status():
+    return {"enabled": enabled, "sample_rate": sample_rate, "slow_query_ms": slow_query_ms}
+
+
+def profile_request(path, fn):
+    """Call fn(), under cProfile for a sample of requests while profiling is on.
+
+    Only one request is profiled at a time: from Python 3.12 the profiler hook
+    is process-wide and a second one raises. Requests sampled while another is
+    being profiled simply run unprofiled, and a profiler failure never fails
+    the request. Calls made by other threads meanwhile can still show up.
+    """
+    if not enabled or random.random() >= sample_rate:
+        return fn()
+    if not _profile_lock.acquire(blocking=False):
+        return fn()
+
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another tool (debugger, coverage) already owns the profiling hook
+            return fn()
+        try:
+            return fn()
+        finally:
+            profiler.disable()
+            try:
+                _collect(path, profiler)
+            except Exception:
+                traceback.print_exc()
+    finally:
+        _profile_lock.release()
+
+
+def _collect(path, profiler):
+    global _stats
+    with _lock:
+        if _stats is None:
+            _stats = pstats.Stats(profiler)
+        else:
+            _stats.add(profiler)
+        _sampled[path] = _sampled.get(path, 0) + 1
+
+
+def hot_functions(limit=25):
+    """Aggregated profile, most cumulative time first"""
+    with _lock:
+        if _stats is None:
+            return []
+        rows = []
+        for (filename, line, name), (cc, nc, tt, ct, _) in _stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": nc,
+                "total_ms": round(tt * 1000, 3),
+                "cumulative_ms": round(ct * 1000, 3)
+            })
+    rows.sort(key=lambda r: r['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+def report(limit=25):
+    with _lock:
+        sampled = dict(_sampled)
+        slow = list(_slow_queries)
+    return dict(status(), sampled_requests=sampled,
+                hot_functions=hot_functions(limit), slow_queries=slow)
+
+
+def print_report(limit=25):
+    with _lock:
+        if _stats is None:
+            print("Profiler: no samples collected")
+        else:
+            _stats.sort_stats('cumulative').print_stats(limit)
+    for query in list(_slow_queries):
+        print(f"Slow query {query['ms']} ms: {query['sql']}")
+        for step in query['plan']:
+            print(f"    {step}")
+
+
+def _record_slow(conn, sql, params, elapsed_ms):
+    try:
+        plan = [row[-1] for row in
+                conn.cursor(sqlite3.Cursor).execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+    except sqlite3.Error:
+        plan = []
+    with _lock:
+        _slow_queries.append({
+            "sql": " ".join(sql.split()),
+            "ms": round(elapsed_ms, 3),
+            "plan": plan,
+            "at": time.time()
+        })
+
+
+class TimedCursor(sqlite3.Cursor):
+    # Times to the first result row; rows fetched later are not included
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        result = super().execute(sql, params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= slow_query_ms and not sql.lstrip().upper().startswith(('BEGIN', 'COMMIT', 'ROLLBACK')):
+            _record_slow(self.connection, sql, params, elapsed_ms)
+        return result
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        result = super().executemany(sql, seq_of_params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= slow_query_ms:
+            with _lock:
+                _slow_queries.append({"sql": " ".join(sql.split()), "ms": round(elapsed_ms, 3),
+                                      "plan": ["executemany"], "at": time.time()})
+        return result
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+
+def connect(path, **kwargs):
+    """sqlite3.connect, timing every statement while profiling is on"""
+    if enabled:
+        kwargs['factory'] = TimedConnection
+    return sqlite3.connect(path, **kwargs)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Request Scheduler
+Admission control that keeps checkout responsive while analytics is busy
+
+Routes fall into priority classes. Checkout is never capped; analytics runs
+a few requests at a time with a short queue, and is turned away with a 503
+and Retry-After when that queue is full or checkout itself is under load.
+"""
+
+import threading
+
+enabled = True
+
+# Analytics is deferred while this many checkout requests are in flight
+CHECKOUT_BUSY = 8
+
+
+class RouteClass:
+    def __init__(self, name, limit=None, queue=0, wait_seconds=0.0, retry_after=1):
+        self.name = name
+        self.limit = limit              # concurrent requests; None = uncapped
+        self.queue = queue              # requests allowed to wait for a slot
+        self.wait_seconds = wait_seconds
+        self.retry_after = retry_after
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def stats(self):
+        return {"inflight": self.inflight, "waiting": self.waiting, "limit": self.limit,
+                "admitted": self.admitted, "rejected": self.rejected}
+
+
+CHECKOUT = RouteClass('checkout')
+STANDARD = RouteClass('standard', limit=16, queue=32, wait_seconds=2.0)
+ANALYTICS = RouteClass('analytics', limit=2, queue=4, wait_seconds=1.0, retry_after=2)
+BULK = RouteClass('bulk', limit=1, queue=0, retry_after=10)
+
+CHECKOUT_ROUTES = {'/api/sell', '/api/reserve', '/api/reserve/release', '/api/inventory/search'}
+ANALYTICS_ROUTES = {'/api/credit-score', '/api/sales-history', '/api/inventory/reorder',
+                    '/api/inventory/export', '/api/analytics/summary'}
+BULK_ROUTES = {'/api/inventory/bulk'}
+
+
+def classify(path):
+    if path in CHECKOUT_ROUTES:
+        return CHECKOUT
+    if path in ANALYTICS_ROUTES:
+        return ANALYTICS
+    if path in BULK_ROUTES:
+        return BULK
+    return STANDARD
+
+
+def admit(path):
+    """Take a slot for `path`; returns its RouteClass, or None to shed the request"""
+    route_class = classify(path)
+    with route_class._cond:
+        if not enabled or route_class.limit is None:
+            route_class.inflight += 1
+            route_class.admitted += 1
+            return route_class
+
+        if route_class is ANALYTICS and CHECKOUT.inflight >= CHECKOUT_BUSY:
+            route_class.rejected += 1
+            return None
+
+        if route_class.inflight >= route_class.limit:
+            if route_class.waiting >= route_class.queue:
+                route_class.rejected += 1
+                return None
+            route_class.waiting += 1
+            got_slot = route_class._cond.wait_for(lambda: route_class.inflight < route_class.limit,
+                                                  route_class.wait_seconds)
+            route_class.waiting -= 1
+            if not got_slot:
+                route_class.rejected += 1
+                return None
+
+        route_class.inflight += 1
+        route_class.admitted += 1
+        return route_class
+
+
+def release(route_class):
+    with route_class._cond:
+        route_class.inflight -= 1
+        route_class._cond.notify()
+
+
+def stats():
+    return {rc.name: rc.stats() for rc in (CHECKOUT, STANDARD, ANALYTICS, BULK)}
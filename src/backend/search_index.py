@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Inventory Search Index
+In-memory prefix index over the inventory table for fast POS item lookup
+"""
+
+import sqlite3
+import threading
+from bisect import bisect_left
+
+
+class InventoryIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}     # id -> item dict
+        self._keys = []      # sorted (token, id) pairs
+        self.ready = False
+
+    def load(self, conn):
+        """Rebuild the whole index from the inventory table"""
+        # Hold the lock while reading so concurrent updates apply after the reload
+        with self._lock:
+            c = conn.cursor()
+            c.execute("SELECT id, name, price, quantity FROM inventory")
+            items = {}
+            for row in c.fetchall():
+                items[row[0]] = {"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]}
+
+            keys = []
+            for item in items.values():
+                keys.extend((token, item['id']) for token in self._tokens(item['name']))
+            keys.sort()
+
+            self._items = items
+            self._keys = keys
+            self.ready = True
+        return len(items)
+
+    def upsert(self, item):
+        """Add a new item or replace an existing one"""
+        with self._lock:
+            self._remove(item['id'])
+            self._items[item['id']] = dict(item)
+            for token in self._tokens(item['name']):
+                key = (token, item['id'])
+                self._keys.insert(bisect_left(self._keys, key), key)
+
+    def update(self, item_id, **fields):
+        """Update price/quantity of an indexed item in place"""
+        with self._lock:
+            item = self._items.get(item_id)
+            if item:
+                item.update(fields)
+            return item
+
+    def remove(self, item_id):
+        """Drop an item from the index"""
+        with self._lock:
+            self._remove(item_id)
+
+    def search(self, query, limit=10):
+        """Return up to `limit` items whose name words start with every query term"""
+        terms = self._tokens(query)
+        if not terms:
+            return []
+
+        results = []
+        seen = set()
+        with self._lock:
+            # Scan the term with the fewest matching words, check the others per item
+            ranges = {t: self._prefix_range(t) for t in terms}
+            first = min(terms, key=lambda t: ranges[t][1] - ranges[t][0])
+            rest = [t for t in terms if t != first]
+            i, end = ranges[first]
+            while i < end and len(results) < limit:
+                item_id = self._keys[i][1]
+                i += 1
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                item = self._items[item_id]
+                if rest:
+                    words = self._tokens(item['name'])
+                    if not all(any(w.startswith(t) for w in words) for t in rest):
+                        continue
+                results.append(dict(item))
+        return results
+
+    def __len__(self):
+        return len(self._items)
+
+    def _prefix_range(self, prefix):
+        """Slice of _keys whose tokens start with prefix"""
+        return (bisect_left(self._keys, (prefix,)),
+                bisect_left(self._keys, (prefix + '\U0010ffff',)))
+
+    def _remove(self, item_id):
+        item = self._items.pop(item_id, None)
+        if not item:
+            return
+        for token in self._tokens(item['name']):
+            key = (token, item_id)
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                del self._keys[i]
+
+    @staticmethod
+    def _tokens(text):
+        """Distinct lowercased words, so 'r10' finds 'Airtime R10'"""
+        return list(dict.fromkeys(str(text).lower().split()))
+
+
+def enable_fts(conn):
+    """Create an FTS5 index over inventory names; returns False if FTS5 is unavailable"""
+    c = conn.cursor()
+    try:
+        c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts
+                     USING fts5(name, content='inventory', content_rowid='id')''')
+    except sqlite3.OperationalError:
+        return False
+
+    c.execute('''CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory BEGIN
+                   INSERT INTO inventory_fts(rowid, name) VALUES (new.id, new.name);
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory BEGIN
+                   INSERT INTO inventory_fts(inventory_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                 END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE OF name ON inventory BEGIN
+                   INSERT INTO inventory_fts(inventory_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                   INSERT INTO inventory_fts(rowid, name) VALUES (new.id, new.name);
+                 END''')
+    c.execute("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def suspend_fts(conn):
+    """Drop the FTS sync triggers for a bulk load; returns True if there were any.
+
+    Call enable_fts() afterwards to recreate them and rebuild the index once.
+    """
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'inventory_fts_%'")
+    if not c.fetchone()[0]:
+        return False
+    for trigger in ('inventory_fts_ai', 'inventory_fts_ad', 'inventory_fts_au'):
+        c.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.commit()
+    return True
+
+
+def fts_search(conn, query, limit=10):
+    """Prefix full-text search through the SQLite FTS5 index"""
+    terms = [t.replace('"', '') for t in query.split()]
+    terms = [t for t in terms if t]
+    if not terms:
+        return []
+    match = ' '.join(f'"{t}"*' for t in terms)
+    c = conn.cursor()
+    c.execute('''SELECT i.id, i.name, i.price, i.quantity FROM inventory_fts f
+                 JOIN inventory i ON i.id = f.rowid
+                 WHERE inventory_fts MATCH ? ORDER BY rank LIMIT ?''', (match, limit))
+    return [{"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]}
+            for row in c.fetchall()]
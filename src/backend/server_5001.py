@@ -1,44 +1,187 @@
 #!/usr/bin/env python3
 import json
+import math
+import os
+import signal
 import sqlite3
-from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from search_index import InventoryIndex, enable_fts, fts_search
+import backup
+import bulk
+import forecasting
+from ledger import SalesLedger
+import pos_data
+import profiling
+import scheduler
+import stock
+
+inventory_index = InventoryIndex()
+# Optional in-memory columnar copy of sales for analytics
+sales_ledger = SalesLedger() if os.getenv('POS_LEDGER') == '1' else None
+
+KEEPALIVE_SECONDS = 15
+
+NOT_FOUND = {"error": "Not found"}
+
+def parse_id(value):
+    """Row id from a JSON int or digit string, else None (SQLite would coerce '1.0' to 1)"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+def positive_int(value):
+    """value if it is a JSON integer SQLite can store and above 0, else None"""
+    if isinstance(value, int) and not isinstance(value, bool) and 0 < value < 2 ** 63:
+        return value
+    return None
 
 class POSHandler(BaseHTTPRequestHandler):
+    # Persistent connections: every response must carry Content-Length
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = KEEPALIVE_SECONDS
+    # Headers and body go out as separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.send_keepalive_headers()
         self.end_headers()
 
-    def do_GET(self):
-        self.send_response(200)
+    def send_keepalive_headers(self):
+        """Close the connection after this response if the server is at its keep-alive cap"""
+        server = self.server
+        if getattr(self, 'body_pending', False):
+            # Part of the request body was never read, so the stream can't be reused
+            self.send_header('Connection', 'close')
+        elif getattr(server, 'open_connections', 0) > getattr(server, 'max_keepalive_connections', float('inf')):
+            self.send_header('Connection', 'close')
+        else:
+            self.send_header('Keep-Alive', f'timeout={KEEPALIVE_SECONDS}')
+
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_keepalive_headers()
         self.end_headers()
-        
-        path = urlparse(self.path).path
+        self.wfile.write(body)
+
+    def send_stream(self, chunks, content_type):
+        """Send a response of unknown length with chunked transfer encoding"""
+        self.streaming = True
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_keepalive_headers()
+        self.end_headers()
+        for chunk in chunks:
+            if chunk:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+        self.streaming = False
+
+    def handle_scheduled(self, path, route):
+        """Run a route under admission control; overloaded requests get 503"""
+        route_class = scheduler.admit(path)
+        if route_class is None:
+            retry_after = scheduler.classify(path).retry_after
+            self.send_json({"error": "Server busy, try again shortly"}, 503,
+                           {'Retry-After': str(retry_after)})
+            return
+        try:
+            result = profiling.profile_request(path, route)
+        except Exception as e:
+            traceback.print_exc()
+            if getattr(self, 'streaming', False):
+                # Headers are already out; dropping the connection is the only signal left
+                self.close_connection = True
+                return
+            # Answer with a framed error so the keep-alive connection stays usable
+            self.send_json({"error": f"Internal server error: {e}"}, 500)
+            return
+        finally:
+            scheduler.release(route_class)
+        # Streaming routes have already written their response and return None
+        if result is not None:
+            self.send_json(result, 404 if result is NOT_FOUND else 200)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.handle_scheduled(url.path, lambda: self.route_get(url))
+
+    def route_get(self, url):
+        path = url.path
         
         if path == '/api/inventory':
             data = self.get_inventory()
+        elif path == '/api/inventory/search':
+            data = self.search_inventory(parse_qs(url.query))
+        elif path == '/api/health':
+            data = {"status": "ok", "warm": caches_warm, "startup_ms": startup_timings,
+                    "scheduler": scheduler.stats()}
+        elif path == '/api/inventory/reorder':
+            data = self.get_reorder_report(parse_qs(url.query))
+        elif path == '/api/inventory/export':
+            data = self.export_inventory(parse_qs(url.query))
         elif path == '/api/credit-score':
             data = self.get_credit_score()
         elif path == '/api/sales-history':
             data = self.get_sales_history()
+        elif path == '/api/analytics/summary':
+            data = self.get_sales_summary(parse_qs(url.query))
+        elif path == '/api/admin/profile':
+            data = self.admin_profile(None)
+        elif path == '/api/admin/backup':
+            data = self.admin_backup(None)
         else:
-            data = {"error": "Not found"}
-            
-        self.wfile.write(json.dumps(data).encode())
+            data = NOT_FOUND
+        
+        return data
 
     def do_POST(self):
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
-        data = json.loads(post_data.decode('utf-8'))
+        url = urlparse(self.path)
+        if url.path == '/api/inventory/bulk':
+            # The upload is parsed while it streams in rather than read up front
+            self.body_pending = True
+            self.handle_scheduled(url.path, lambda: self.bulk_import(parse_qs(url.query)))
+            return
+        
+        # Until the body is fully read, a bad length or chunk header leaves the stream unusable
+        self.body_pending = True
+        try:
+            if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                post_data = ''.join(bulk.body_lines(self.rfile, self.headers))
+            else:
+                content_length = int(self.headers.get('Content-Length') or 0)
+                post_data = self.rfile.read(content_length).decode('utf-8')
+            self.body_pending = False
+            data = json.loads(post_data)
+        except ValueError:
+            self.send_json({"error": "Invalid JSON body"}, 400)
+            return
         
         path = urlparse(self.path).path
-        
+        self.handle_scheduled(path, lambda: self.route_post(path, data))
+
+    def route_post(self, path, data):
         if path == '/api/inventory':
             result = self.add_inventory(data)
         elif path == '/api/inventory/refill':
@@ -47,236 +190,389 @@ class POSHandler(BaseHTTPRequestHandler):
             result = self.update_price(data)
         elif path == '/api/sell':
             result = self.process_sale(data)
+        elif path == '/api/reserve':
+            result = self.reserve_stock(data)
+        elif path == '/api/reserve/release':
+            result = self.release_reservation(data)
+        elif path == '/api/admin/profile':
+            result = self.admin_profile(data)
+        elif path == '/api/admin/backup':
+            result = self.admin_backup(data)
         else:
-            result = {"error": "Not found"}
+            result = NOT_FOUND
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+        return result
 
     def do_DELETE(self):
         path = urlparse(self.path).path
-        
+        self.handle_scheduled(path, lambda: self.route_delete(path))
+
+    def route_delete(self, path):
         if path.startswith('/api/inventory/'):
-            item_id = path.split('/')[-1]
-            result = self.delete_inventory(item_id)
-        else:
-            result = {"error": "Not found"}
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+            item_id = parse_id(path[len('/api/inventory/'):])
+            if item_id is None:
+                return NOT_FOUND
+            return self.delete_inventory(item_id)
+        return NOT_FOUND
+
+    def admin_authorized(self):
+        token = os.getenv('POS_ADMIN_TOKEN')
+        return not token or self.headers.get('X-Admin-Token') == token
+
+    def admin_profile(self, data):
+        if not self.admin_authorized():
+            return {"error": "Unauthorized"}
+        
+        if data is None:
+            return profiling.report()
+        
+        try:
+            settings = profiling.configure(enable=data.get('enabled'),
+                                           rate=data.get('sample_rate'),
+                                           threshold_ms=data.get('slow_query_ms'))
+        except ValueError as e:
+            return {"error": str(e)}
+        if data.get('reset'):
+            profiling.reset()
+        return settings
+
+    def admin_backup(self, data):
+        if not self.admin_authorized():
+            return {"error": "Unauthorized"}
+        
+        if data is None:
+            return dict(backup_state, backup_dir=BACKUP_DIR)
+        
+        with backup_lock:
+            if backup_state['running']:
+                return {"error": "Backup already running"}
+            backup_state['running'] = True
+        threading.Thread(target=run_backup, args=(bool(data.get('full')),), daemon=True).start()
+        return {"message": f"Backup started into {BACKUP_DIR}"}
 
     def get_inventory(self):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        c.execute("SELECT * FROM inventory")
-        items = [{"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]} 
-                 for row in c.fetchall()]
+        conn = profiling.connect('pos_system.db')
+        items = pos_data.get_inventory(conn)
         conn.close()
         return items
 
+    def search_inventory(self, params):
+        query = params.get('q', [''])[0]
+        try:
+            limit = max(1, min(int(params.get('limit', ['10'])[0]), 100))
+        except ValueError:
+            limit = 10
+        
+        if params.get('fts', ['0'])[0] == '1':
+            conn = profiling.connect('pos_system.db')
+            try:
+                return fts_search(conn, query, limit)
+            except sqlite3.OperationalError:
+                return {"error": "Full-text search not available"}
+            finally:
+                conn.close()
+        
+        if not inventory_index.ready:
+            # Index still warming up after a restart
+            conn = profiling.connect('pos_system.db')
+            c = conn.cursor()
+            c.execute("SELECT id, name, price, quantity FROM inventory WHERE name LIKE ? ORDER BY name LIMIT ?",
+                     (query.strip() + '%', limit))
+            items = [{"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]}
+                     for row in c.fetchall()]
+            conn.close()
+            return items
+        
+        return inventory_index.search(query, limit)
+
+    def get_reorder_report(self, params):
+        try:
+            lead_days = float(params.get('lead_days', [forecasting.DEFAULT_LEAD_DAYS])[0])
+            target_days = float(params.get('target_days', [forecasting.DEFAULT_TARGET_DAYS])[0])
+        except ValueError:
+            return {"error": "lead_days and target_days must be numbers"}
+        
+        conn = profiling.connect('pos_system.db')
+        report = forecasting.reorder_report(conn, lead_days, target_days)
+        conn.close()
+        return report
+
+    def bulk_import(self, params):
+        fmt = params.get('format', [None])[0]
+        if fmt is None:
+            content_type = self.headers.get('Content-Type', '')
+            fmt = 'ndjson' if 'ndjson' in content_type or 'json' in content_type else 'csv'
+        if fmt not in bulk.FORMATS:
+            return {"error": f"Unsupported format, use one of: {', '.join(bulk.FORMATS)}"}
+        add_quantity = params.get('mode', ['replace'])[0] == 'add'
+        
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        rows = bulk.parse_rows(bulk.body_lines(self.rfile, self.headers), fmt)
+        summary = bulk.import_rows(conn, rows, add_quantity)
+        self.body_pending = False
+        
+        inventory_index.load(conn)
+        conn.close()
+        return summary
+
+    def export_inventory(self, params):
+        fmt = params.get('format', ['csv'])[0]
+        if fmt not in bulk.FORMATS:
+            return {"error": f"Unsupported format, use one of: {', '.join(bulk.FORMATS)}"}
+        
+        conn = profiling.connect('pos_system.db')
+        try:
+            self.send_stream(bulk.export_rows(conn, fmt),
+                             'text/csv' if fmt == 'csv' else 'application/x-ndjson')
+        finally:
+            conn.close()
+        return None
+
     def add_inventory(self, data):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO inventory (name, price, quantity) VALUES (?, ?, ?)",
-                 (data['name'], data['price'], data['quantity']))
-        conn.commit()
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            c.execute("INSERT INTO inventory (name, price, quantity) VALUES (?, ?, ?)",
+                      (data['name'], data['price'], data['quantity']))
+            # Index the row as SQLite stored it (REAL price, coerced quantity)
+            c.execute("SELECT id, name, price, quantity FROM inventory WHERE id = ?", (c.lastrowid,))
+            row = c.fetchone()
+            inventory_index.upsert({"id": row[0], "name": row[1], "price": row[2], "quantity": row[3]})
         conn.close()
         return {"message": "Item added successfully"}
 
     def process_sale(self, data):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        c.execute("SELECT price, quantity FROM inventory WHERE name = ?", (data['item_name'],))
-        result = c.fetchone()
-        
-        if not result:
-            conn.close()
-            return {"error": "Item not found"}
-        
-        price, stock = result
-        if stock < data['quantity']:
-            conn.close()
-            return {"error": "Not enough stock"}
+        payment_method = data.get('payment_method')
+        if not isinstance(payment_method, str) or not payment_method:
+            return {"error": "payment_method is required"}
+        reservation_id = data.get('reservation_id')
+        if not reservation_id:
+            item_name, quantity = data.get('item_name'), positive_int(data.get('quantity'))
+            if not isinstance(item_name, str) or quantity is None:
+                return {"error": "item_name and a positive integer quantity are required"}
+        
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        
+        # The stock check and decrement are one statement under the write lock.
+        # Index changes wait for the sale row, so a rollback leaves the index alone.
+        index_updates = []
+        with stock.write_transaction(conn) as c:
+            if reservation_id:
+                result = stock.consume(c, reservation_id)
+                if not result:
+                    result = "Reservation not found or expired"
+                else:
+                    item_id, item_name, quantity, price = result
+            else:
+                result = stock.take_stock(c, item_name, quantity)
+                if result == "Not enough stock":
+                    # Abandoned carts may still be holding the stock
+                    released = stock.release_expired(c, item_name=item_name)
+                    index_updates.extend(released)
+                    if released:
+                        result = stock.take_stock(c, item_name, quantity)
+                if not isinstance(result, str):
+                    item_id, price, remaining = result
+                    index_updates.append((item_id, remaining))
+            
+            if not isinstance(result, str):
+                total = price * quantity
+                amount_received = data.get('amount_received', total)
+                change = data.get('change', 0)
+                timestamp = datetime.now().isoformat()
+                
+                c.execute("INSERT INTO sales (item_name, quantity, total, payment_method, amount_received, change_given, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (item_name, quantity, total, payment_method, amount_received, change, timestamp))
+                sale_id = c.lastrowid
+                
+                forecasting.record_sale(conn, item_name, quantity, timestamp)
+            
+            # Still inside the write lock, so a slower sale can't overwrite a newer count
+            for updated_id, updated_quantity in index_updates:
+                inventory_index.update(updated_id, quantity=updated_quantity)
+        conn.close()
         
-        total = price * data['quantity']
-        amount_received = data.get('amount_received', total)
-        change = data.get('change', 0)
+        if isinstance(result, str):
+            return {"error": result}
         
-        c.execute("UPDATE inventory SET quantity = quantity - ? WHERE name = ?",
-                 (data['quantity'], data['item_name']))
+        if sales_ledger is not None:
+            sales_ledger.append(sale_id, timestamp, item_name, quantity, total, payment_method)
         
-        c.execute("INSERT INTO sales (item_name, quantity, total, payment_method, amount_received, change_given, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                 (data['item_name'], data['quantity'], total, data['payment_method'], amount_received, change, datetime.now().isoformat()))
+        return {"message": f"Sold {quantity} x {item_name} for R{total}"}
+
+    def reserve_stock(self, data):
+        try:
+            seconds = float(data.get('seconds', stock.DEFAULT_RESERVATION_SECONDS))
+        except (TypeError, ValueError):
+            return {"error": "seconds must be a number"}
+        if not math.isfinite(seconds) or seconds <= 0:
+            return {"error": "seconds must be a positive number"}
+        item_name, quantity = data.get('item_name'), positive_int(data.get('quantity'))
+        if not isinstance(item_name, str) or quantity is None:
+            return {"error": "item_name and a positive integer quantity are required"}
+        
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            index_updates = stock.release_expired(c)
+            result = stock.reserve(c, item_name, quantity, seconds)
+            if not isinstance(result, str):
+                index_updates.append((result['item_id'], result['remaining']))
+            for item_id, remaining in index_updates:
+                inventory_index.update(item_id, quantity=remaining)
+        conn.close()
         
-        conn.commit()
+        if isinstance(result, str):
+            return {"error": result}
+        return result
+
+    def release_reservation(self, data):
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            result = stock.release(c, data['reservation_id'])
+            if result:
+                item_id, quantity = result
+                inventory_index.update(item_id, quantity=quantity)
         conn.close()
         
-        return {"message": f"Sold {data['quantity']} x {data['item_name']} for R{total}"}
+        if not result:
+            return {"error": "Reservation not found"}
+        return {"message": "Reservation released"}
 
     def get_credit_score(self):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        c.execute("SELECT SUM(total), COUNT(*) FROM sales")
-        result = c.fetchone()
-        total_sales, transaction_count = result[0] or 0, result[1] or 0
-        
-        # Calculate digital payment adoption
-        c.execute("SELECT COUNT(*) FROM sales WHERE payment_method != 'cash'")
-        digital_count = c.fetchone()[0]
-        digital_adoption = (digital_count / transaction_count * 100) if transaction_count else 0
-        
-        # Calculate consistency (sales in last 30 days)
-        c.execute("SELECT COUNT(DISTINCT date(timestamp)) FROM sales WHERE date(timestamp) >= date('now', '-30 days')")
-        active_days = c.fetchone()[0]
-        consistency = min(active_days / 30 * 100, 100)
-        
-        avg_transaction = total_sales / transaction_count if transaction_count else 0
-        
-        # More challenging scoring algorithm
-        # Sales Volume (25%) - requires R5000+ for full points
-        sales_score = min(total_sales / 5000 * 25, 25)
-        
-        # Transaction Frequency (25%) - requires 100+ transactions for full points  
-        frequency_score = min(transaction_count / 100 * 25, 25)
-        
-        # Average Transaction (20%) - requires R50+ avg for full points
-        avg_score = min(avg_transaction / 50 * 20, 20)
-        
-        # Digital Adoption (15%) - requires 50%+ digital payments
-        digital_score = min(digital_adoption / 50 * 15, 15)
-        
-        # Business Consistency (15%) - requires 20+ active days per month
-        consistency_score = min(active_days / 20 * 15, 15)
-        
-        final_score = int(sales_score + frequency_score + avg_score + digital_score + consistency_score)
+        if sales_ledger is not None and sales_ledger.ready:
+            return pos_data.score_business(*sales_ledger.credit_inputs())
         
+        conn = profiling.connect('pos_system.db')
+        score = pos_data.get_credit_score(conn)
         conn.close()
-        return {
-            "score": final_score,
-            "total_sales": total_sales,
-            "transaction_count": transaction_count,
-            "avg_transaction": avg_transaction,
-            "digital_adoption": digital_adoption,
-            "active_days": active_days
-        }
+        return score
+
+    def get_sales_summary(self, params):
+        try:
+            days = max(1, min(int(params.get('days', ['7'])[0]), 366))
+            limit = max(1, min(int(params.get('limit', ['5'])[0]), 50))
+        except ValueError:
+            return {"error": "days and limit must be integers"}
+        
+        if sales_ledger is not None and sales_ledger.ready:
+            start = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+            summary = dict(days=days, **sales_ledger.range_totals(start=start))
+            summary['top_items'] = sales_ledger.top_items(days, limit)
+            return summary
+        
+        conn = profiling.connect('pos_system.db')
+        summary = pos_data.get_sales_summary(conn, days, limit)
+        conn.close()
+        return summary
 
     def get_sales_history(self):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        c.execute("SELECT * FROM sales ORDER BY timestamp DESC LIMIT 50")
-        sales = []
-        for row in c.fetchall():
-            if len(row) >= 8:
-                sales.append({
-                    "id": row[0], "item_name": row[1], "quantity": row[2], 
-                    "total": row[3], "payment_method": row[4], 
-                    "amount_received": row[5], "change_given": row[6], 
-                    "timestamp": row[7]
-                })
-            else:
-                sales.append({
-                    "id": row[0], "item_name": row[1], "quantity": row[2], 
-                    "total": row[3], "payment_method": row[4], 
-                    "timestamp": row[5]
-                })
-        
+        conn = profiling.connect('pos_system.db')
+        sales = pos_data.get_sales_history(conn)
         conn.close()
         return sales
 
     def delete_inventory(self, item_id):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        # Check if item exists
-        c.execute("SELECT * FROM inventory WHERE id = ?", (item_id,))
-        if not c.fetchone():
-            conn.close()
-            return {"error": "Item not found"}
-        
-        # Delete the item
-        c.execute("DELETE FROM inventory WHERE id = ?", (item_id,))
-        rows_affected = c.rowcount
-        conn.commit()
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            c.execute("DELETE FROM inventory WHERE id = ?", (item_id,))
+            deleted = c.rowcount > 0
+            if deleted:
+                inventory_index.remove(item_id)
         conn.close()
         
-        if rows_affected > 0:
-            return {"message": "Item deleted successfully"}
-        else:
-            return {"error": "Failed to delete item"}
+        if not deleted:
+            return {"error": "Item not found"}
+        return {"message": "Item deleted successfully"}
 
     def refill_inventory(self, data):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        print(f"DEBUG: Refill request for item_id: {data['item_id']}, quantity: {data['quantity']}")
-        
-        # Check if item exists first
-        c.execute("SELECT name, quantity FROM inventory WHERE id = ?", (data['item_id'],))
-        result = c.fetchone()
-        
-        print(f"DEBUG: Database result: {result}")
+        item_id = parse_id(data.get('item_id'))
+        if item_id is None:
+            return {"error": "item_id must be an integer"}
+        quantity = positive_int(data.get('quantity'))
+        if quantity is None:
+            return {"error": "quantity must be a positive integer"}
+        
+        # Added in SQL under the write lock, so concurrent sales are never overwritten
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            result = stock.add_stock(c, item_id, quantity)
+            if result:
+                inventory_index.update(item_id, quantity=result[1])
+        conn.close()
         
         if not result:
-            conn.close()
             return {"error": "Item not found"}
         
-        item_name, current_quantity = result
-        new_quantity = current_quantity + data['quantity']
-        
-        print(f"DEBUG: Current: {current_quantity}, Adding: {data['quantity']}, New: {new_quantity}")
-        
-        # Update quantity by adding to existing stock
-        c.execute("UPDATE inventory SET quantity = ? WHERE id = ?",
-                 (new_quantity, data['item_id']))
-        
-        rows_affected = c.rowcount
-        print(f"DEBUG: Rows affected: {rows_affected}")
-        
-        conn.commit()
-        
-        # Verify the update
-        c.execute("SELECT quantity FROM inventory WHERE id = ?", (data['item_id'],))
-        final_quantity = c.fetchone()[0]
-        print(f"DEBUG: Final quantity in DB: {final_quantity}")
-        
-        conn.close()
-        
-        return {"message": f"Added {data['quantity']} {item_name} to stock. New total: {new_quantity}"}
+        item_name, new_quantity = result
+        return {"message": f"Added {quantity} {item_name} to stock. New total: {new_quantity}"}
 
     def update_price(self, data):
-        conn = sqlite3.connect('pos_system.db')
-        c = conn.cursor()
-        
-        # Check if item exists first
-        c.execute("SELECT name FROM inventory WHERE id = ?", (data['item_id'],))
-        result = c.fetchone()
+        item_id = parse_id(data.get('item_id'))
+        if item_id is None:
+            return {"error": "item_id must be an integer"}
+        
+        conn = profiling.connect('pos_system.db', timeout=10, isolation_level=None)
+        with stock.write_transaction(conn) as c:
+            c.execute("UPDATE inventory SET price = ? WHERE id = ?", (data['price'], item_id))
+            c.execute("SELECT name, price FROM inventory WHERE id = ?", (item_id,))
+            result = c.fetchone()
+            if result:
+                inventory_index.update(item_id, price=result[1])
+        conn.close()
         
         if not result:
-            conn.close()
             return {"error": "Item not found"}
         
-        item_name = result[0]
-        
-        # Update price
-        c.execute("UPDATE inventory SET price = ? WHERE id = ?",
-                 (data['price'], data['item_id']))
-        
-        conn.commit()
-        conn.close()
-        
-        return {"message": f"Updated {item_name} price to R{data['price']}"}
+        return {"message": f"Updated {result[0]} price to R{data['price']}"}
 
-if __name__ == '__main__':
-    # Initialize database
+startup_timings = {}
+caches_warm = False
+
+def timed(phase, fn, *args):
+    """Run one startup phase and record how long it took"""
+    start = time.perf_counter()
+    result = fn(*args)
+    startup_timings[phase] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+BACKUP_DIR = os.getenv('POS_BACKUP_DIR', 'backups')
+backup_state = {"running": False, "last": None, "error": None}
+backup_lock = threading.Lock()
+
+def run_backup(full=False):
+    """Online snapshot in small page steps; sales keep committing meanwhile"""
+    try:
+        entry = backup.snapshot('pos_system.db', BACKUP_DIR, full)
+        backup_state.update(last=entry, error=None)
+        print(f"Backup wrote {entry['file']}: {entry['pages']} of {entry['page_count']} pages")
+    except (sqlite3.Error, OSError, ValueError) as e:
+        backup_state['error'] = str(e)
+        print(f"Backup failed: {e}")
+    finally:
+        backup_state['running'] = False
+
+class POSServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 overflows under bursts and clients
+    # then wait a full second for the SYN retry
+    request_queue_size = 128
+    # Connections beyond this are answered with Connection: close
+    max_keepalive_connections = 64
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.open_connections = 0
+        self._connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self.open_connections += 1
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self.open_connections -= 1
+        super().shutdown_request(request)
+
+def init_db():
     conn = sqlite3.connect('pos_system.db')
     c = conn.cursor()
     
@@ -288,9 +584,67 @@ if __name__ == '__main__':
                   total REAL, payment_method TEXT, amount_received REAL, 
                   change_given REAL, timestamp TEXT)''')
     
+    # Sales look items up by exact name
+    c.execute("CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name)")
+    
+    forecasting.init_velocity_table(conn)
+    stock.init_reservation_table(conn)
     conn.commit()
+    
+    # WAL lets analytics reads run while a sale holds the write lock
+    c.execute("PRAGMA journal_mode=WAL")
     conn.close()
+
+def warm_page_cache(path='pos_system.db'):
+    """Read the database file once so the OS page cache holds it"""
+    with open(path, 'rb') as f:
+        while f.read(1 << 20):
+            pass
+
+def warm_caches():
+    """Build indexes and prime caches while the server already accepts requests"""
+    global caches_warm
+    conn = sqlite3.connect('pos_system.db')
+    c = conn.cursor()
+    
+    timed('page_cache', warm_page_cache)
+    
+    c.execute("SELECT COUNT(*) FROM stock_velocity")
+    if c.fetchone()[0] == 0:
+        sales, items = timed('velocity_backfill', forecasting.backfill, conn)
+        if sales:
+            print(f"Backfilled stock velocity for {items} items from {sales} sales")
+    
+    if not timed('fts_index', enable_fts, conn):
+        print("Warning: SQLite FTS5 not available, using in-memory search only")
+    
+    # Stock held by carts that were abandoned while the server was down
+    with stock.write_transaction(conn) as wc:
+        timed('expired_reservations', stock.release_expired, wc)
+    
+    count = timed('search_index', inventory_index.load, conn)
+    print(f"Search index loaded with {count} items")
+    
+    if sales_ledger is not None:
+        count = timed('sales_ledger', sales_ledger.load, conn)
+        print(f"Sales ledger loaded with {count} sales")
+    
+    timed('credit_score', pos_data.get_credit_score, conn)
+    timed('sales_history', pos_data.get_sales_history, conn)
+    
+    conn.close()
+    caches_warm = True
+    print(f"Startup phases (ms): {startup_timings}")
+
+if __name__ == '__main__':
+    timed('init_db', init_db)
+    
+    # kill -USR1 toggles profiling, kill -USR2 prints what it collected
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda *_: print(f"Profiling: {profiling.toggle()}"))
+        signal.signal(signal.SIGUSR2, lambda *_: profiling.print_report())
     
     print("Server starting on http://localhost:5001")
-    server = HTTPServer(('localhost', 5001), POSHandler)
-    server.serve_forever()
\ No newline at end of file
+    server = timed('bind', POSServer, ('localhost', 5001), POSHandler)
+    threading.Thread(target=warm_caches, daemon=True).start()
+    server.serve_forever()
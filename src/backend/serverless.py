@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Serverless Support
+Shared handler base for the Vercel functions in api/
+
+Module-level state survives between warm invocations, so the SQLite
+connection and serialized responses are created once per instance.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+from http.server import BaseHTTPRequestHandler
+
+BUNDLED_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pos_system.db')
+
+_conn = None
+_responses = {}  # key -> (data version, encoded JSON)
+
+
+def db_path():
+    """POS_DB_PATH if set, else the bundled database (copied to /tmp on read-only deploys)"""
+    path = os.getenv('POS_DB_PATH')
+    if path:
+        return path
+    if os.access(os.path.dirname(BUNDLED_DB), os.W_OK):
+        return BUNDLED_DB
+    tmp_path = '/tmp/pos_system.db'
+    if not os.path.exists(tmp_path):
+        shutil.copyfile(BUNDLED_DB, tmp_path)
+    return tmp_path
+
+
+def get_connection():
+    """One connection per warm instance"""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(db_path(), check_same_thread=False)
+    return _conn
+
+
+def _data_version(conn):
+    # data_version changes on commits from other connections, total_changes on our own
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def cached_json(key, compute):
+    """Encoded JSON for `compute(conn)`, reused until the database changes"""
+    conn = get_connection()
+    version = _data_version(conn)
+    cached = _responses.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+    body = json.dumps(compute(conn)).encode()
+    _responses[key] = (version, body)
+    return body
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    allowed_methods = 'GET, OPTIONS'
+
+    def send_json(self, body, status=200):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        content_length = int(self.headers['Content-Length'])
+        return json.loads(self.rfile.read(content_length).decode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', self.allowed_methods)
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
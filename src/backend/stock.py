@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Stock Reservation
+Atomic stock decrements and short-lived cart reservations
+
+Every function here expects to run inside write_transaction().
+"""
+
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# UPDATE ... RETURNING needs SQLite 3.35+
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+DEFAULT_RESERVATION_SECONDS = 300
+MAX_RESERVATION_SECONDS = 1800
+
+# SQLite's busy handler backs off with sleeps when writers collide; queueing
+# this process's writers on a lock hands the database over immediately
+write_lock = threading.Lock()
+
+
+@contextmanager
+def write_transaction(conn):
+    """BEGIN IMMEDIATE ... COMMIT on a connection opened with isolation_level=None"""
+    with write_lock:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            yield c
+        except Exception:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
+
+
+def init_reservation_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS stock_reservations
+                    (id TEXT PRIMARY KEY, item_id INTEGER, item_name TEXT,
+                     quantity INTEGER, expires_at REAL)''')
+
+
+def take_stock(c, item_name, quantity):
+    """Decrement stock only if enough is left.
+
+    Returns (item_id, price, new_quantity), or an error string.
+    """
+    if HAS_RETURNING:
+        c.execute('''UPDATE inventory SET quantity = quantity - ?
+                     WHERE name = ? AND quantity >= ?
+                     RETURNING id, price, quantity''', (quantity, item_name, quantity))
+        row = c.fetchone()
+    else:
+        c.execute("UPDATE inventory SET quantity = quantity - ? WHERE name = ? AND quantity >= ?",
+                  (quantity, item_name, quantity))
+        row = None
+        if c.rowcount:
+            c.execute("SELECT id, price, quantity FROM inventory WHERE name = ?", (item_name,))
+            row = c.fetchone()
+
+    if row:
+        return row
+
+    c.execute("SELECT 1 FROM inventory WHERE name = ?", (item_name,))
+    return "Not enough stock" if c.fetchone() else "Item not found"
+
+
+def add_stock(c, item_id, quantity):
+    """Add to an item's stock; returns (name, new_quantity) or None if there is no such item"""
+    if HAS_RETURNING:
+        c.execute("UPDATE inventory SET quantity = quantity + ? WHERE id = ? RETURNING name, quantity",
+                  (quantity, item_id))
+        return c.fetchone()
+    c.execute("UPDATE inventory SET quantity = quantity + ? WHERE id = ?", (quantity, item_id))
+    if not c.rowcount:
+        return None
+    c.execute("SELECT name, quantity FROM inventory WHERE id = ?", (item_id,))
+    return c.fetchone()
+
+
+def reserve(c, item_name, quantity, seconds=DEFAULT_RESERVATION_SECONDS):
+    """Hold stock for a cart; returns the reservation dict or an error string"""
+    seconds = min(seconds, MAX_RESERVATION_SECONDS)
+    result = take_stock(c, item_name, quantity)
+    if isinstance(result, str):
+        return result
+
+    item_id, _, remaining = result
+    reservation = {
+        "reservation_id": uuid.uuid4().hex,
+        "item_id": item_id,
+        "item_name": item_name,
+        "quantity": quantity,
+        "remaining": remaining,
+        "expires_at": time.time() + seconds
+    }
+    c.execute("INSERT INTO stock_reservations (id, item_id, item_name, quantity, expires_at) VALUES (?, ?, ?, ?, ?)",
+              (reservation['reservation_id'], item_id, item_name, quantity, reservation['expires_at']))
+    return reservation
+
+
+def consume(c, reservation_id):
+    """Turn a live reservation into a sale; returns (item_id, item_name, quantity, price) or None"""
+    c.execute('''SELECT r.item_id, r.item_name, r.quantity, i.price FROM stock_reservations r
+                 JOIN inventory i ON i.id = r.item_id
+                 WHERE r.id = ? AND r.expires_at > ?''', (reservation_id, time.time()))
+    row = c.fetchone()
+    if row:
+        c.execute("DELETE FROM stock_reservations WHERE id = ?", (reservation_id,))
+    return row
+
+
+def release(c, reservation_id):
+    """Return reserved stock to inventory; returns (item_id, new_quantity) or None"""
+    c.execute("SELECT item_id, quantity FROM stock_reservations WHERE id = ?", (reservation_id,))
+    row = c.fetchone()
+    if not row:
+        return None
+    item_id, quantity = row
+    c.execute("DELETE FROM stock_reservations WHERE id = ?", (reservation_id,))
+    c.execute("UPDATE inventory SET quantity = quantity + ? WHERE id = ?", (quantity, item_id))
+    c.execute("SELECT quantity FROM inventory WHERE id = ?", (item_id,))
+    restored = c.fetchone()
+    return (item_id, restored[0]) if restored else None
+
+
+def release_expired(c, now=None, item_name=None):
+    """Give back stock from expired reservations; returns [(item_id, new_quantity)]"""
+    if item_name is None:
+        c.execute("SELECT id FROM stock_reservations WHERE expires_at <= ?", (now or time.time(),))
+    else:
+        c.execute("SELECT id FROM stock_reservations WHERE expires_at <= ? AND item_name = ?",
+                  (now or time.time(), item_name))
+    released = []
+    for (reservation_id,) in c.fetchall():
+        result = release(c, reservation_id)
+        if result:
+            released.append(result)
+    return released